@@ -88,7 +88,7 @@ ROOT_URLCONF = 'BMR.urls'
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.AllowAny",
@@ -148,11 +148,27 @@ SIMPLE_JWT = {
     "SIGNING_KEY": SECRET_KEY,
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
+# API user resolution (users.authentication): seconds a user stays cached, 0 = load per request
+JWT_USER_CACHE_TTL = int(os.getenv('JWT_USER_CACHE_TTL', 60))
+# Put username, staff flags and role names into issued tokens (for ClaimsJWTAuthentication)
+JWT_USER_CLAIMS = os.getenv('JWT_USER_CLAIMS', 'False').lower() in ('true', '1', 't')
+# Revoked refresh tokens (users.revocation): per-process Bloom filter of blacklisted JTIs,
+# confirmed against the database on hits. Prune expired rows with `manage.py prune_token_blacklist`.
+TOKEN_REVOCATION_FILTER = os.getenv('TOKEN_REVOCATION_FILTER', 'True').lower() in ('true', '1', 't')
+TOKEN_REVOCATION_FILTER_CAPACITY = int(os.getenv('TOKEN_REVOCATION_FILTER_CAPACITY', 200000))  # JTIs
+TOKEN_REVOCATION_FILTER_ERROR_RATE = float(os.getenv('TOKEN_REVOCATION_FILTER_ERROR_RATE', 0.001))
+TOKEN_REVOCATION_FILTER_REBUILD = int(os.getenv('TOKEN_REVOCATION_FILTER_REBUILD', 3600))  # seconds
 
 EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "no-reply@example.com")
+# Public base URL of the site, for links in emails
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000').rstrip('/')
 
 GOOGLE_OAUTH_AUDIENCE = os.getenv("GOOGLE_OAUTH_AUDIENCE", "")
+# Google signing certificates (core.utils.google_auth) are cached for the max-age Google sends
+GOOGLE_CERTS_DEFAULT_TTL = int(os.getenv('GOOGLE_CERTS_DEFAULT_TTL', 3600))  # seconds, when no max-age is sent
+GOOGLE_CERTS_MIN_REFRESH = int(os.getenv('GOOGLE_CERTS_MIN_REFRESH', 60))  # seconds between refetches for unknown key ids
+GOOGLE_CERTS_TIMEOUT = float(os.getenv('GOOGLE_CERTS_TIMEOUT', 5))  # seconds
 EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
@@ -160,6 +176,43 @@ EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True').lower() in ('true', '1', 't')
 EMAIL_USE_SSL = os.getenv('EMAIL_USE_SSL', 'False').lower() in ('true', '1', 't')
 
+# One-time codes (core.utils.otp): "cache", or "db" to keep them on the user row
+OTP_STORE = os.getenv('OTP_STORE', 'cache')
+OTP_TTL_MINUTES = int(os.getenv('OTP_TTL_MINUTES', 10))
+OTP_MAX_ATTEMPTS = int(os.getenv('OTP_MAX_ATTEMPTS', 5))  # wrong guesses before the code is dropped
+
+# Request throttling (core.throttling): sliding-window limits per scope, counted per client address
+# ("ip"), per submitted username/email ("identifier") and across all clients ("route").
+# Rates are "<requests>/<period>", e.g. "5/10min" or "100/h". Counters: `manage.py throttle_stats`.
+THROTTLE_ENABLED = os.getenv('THROTTLE_ENABLED', 'True').lower() in ('true', '1', 't')
+THROTTLE_NUM_PROXIES = int(os.getenv('THROTTLE_NUM_PROXIES', 0))  # trusted proxies appending to X-Forwarded-For
+THROTTLE_RATES = {
+    "login": {"ip": "20/min", "identifier": "10/10min"},
+    "otp_send": {"ip": "10/10min", "identifier": "3/10min"},
+    "otp_verify": {"ip": "30/10min", "identifier": "10/10min"},
+    "register": {"ip": "10/h"},
+    "refresh": {"ip": "60/min"},
+    "lookup": {"ip": "120/min"},
+    "webhook": {"ip": "300/min"},  # per sender only: a shared limit would let anyone starve payment callbacks
+}
+
+# Bulk mailing (core.services.mailing, sent by `manage.py send_mail_campaigns`)
+BULK_MAIL_CONNECTIONS = int(os.getenv('BULK_MAIL_CONNECTIONS', 4))  # persistent SMTP connections
+BULK_MAIL_RATE = float(os.getenv('BULK_MAIL_RATE', 20))  # messages per second, 0 = unthrottled
+BULK_MAIL_CHUNK_SIZE = int(os.getenv('BULK_MAIL_CHUNK_SIZE', 500))
+BULK_MAIL_MAX_ATTEMPTS = int(os.getenv('BULK_MAIL_MAX_ATTEMPTS', 3))
+BULK_MAIL_PROGRESS_EVERY = int(os.getenv('BULK_MAIL_PROGRESS_EVERY', 50))  # messages between ledger writes
+BULK_MAIL_CLAIM_TIMEOUT = int(os.getenv('BULK_MAIL_CLAIM_TIMEOUT', 600))  # seconds without progress before another runner takes over
+
+# Pending-payment reminders (`manage.py send_payment_reminders`)
+PAYMENT_REMINDER_OVERDUE_DAYS = int(os.getenv('PAYMENT_REMINDER_OVERDUE_DAYS', 3))
+PAYMENT_REMINDER_WINDOW_DAYS = int(os.getenv('PAYMENT_REMINDER_WINDOW_DAYS', 7))
+
+# Annual renewals (`manage.py run_renewals`): days after a period ends before the member lapses
+MEMBERSHIP_RENEWAL_GRACE_DAYS = int(os.getenv('MEMBERSHIP_RENEWAL_GRACE_DAYS', 30))
+# Applications approved from this month on are valid until the end of the following year
+MEMBERSHIP_ROLLOVER_MONTH = int(os.getenv('MEMBERSHIP_ROLLOVER_MONTH', 10))
+
 HITPAY_CREATE_PAYMENT_URL= os.getenv('HITPAY_CREATE_PAYMENT_URL')
 HITPAY_SALT = os.getenv('HITPAY_SALT')
 HITPAY_API_KEY = os.getenv('HITPAY_API_KEY')
@@ -194,13 +247,21 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'dashboard.context_processors.notifications',
             ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'BMR.wsgi.application'
+# Production runs the ASGI application, e.g. `uvicorn BMR.asgi:application --workers 4`: the
+# notification stream and the payment long-poll only hold requests open under ASGI. Under WSGI
+# (runserver, sync gunicorn) the stream answers 503 and the long-poll returns without waiting.
+ASGI_APPLICATION = 'BMR.asgi.application'
 AUTH_USER_MODEL = "users.User"
+AUTHENTICATION_BACKENDS = ["users.backends.UsernameOrEmailBackend"]
+# Seconds the role names and permissions of a user (incl. those granted by roles) stay cached
+PERMISSION_CACHE_TTL = int(os.getenv('PERMISSION_CACHE_TTL', 300))
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
@@ -237,6 +298,25 @@ DATABASES = {
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
+# Password hashing: the first hasher hashes new passwords, the rest still verify old hashes.
+# Costs of 0 keep Django's defaults; tune them with `manage.py benchmark_password_hashers`.
+# Changing the algorithm or a cost re-hashes each password on its next successful login.
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'pbkdf2')  # pbkdf2 | scrypt | argon2 (needs argon2-cffi)
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', 0))
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.getenv('PASSWORD_SCRYPT_WORK_FACTOR', 0))  # power of 2
+PASSWORD_ARGON2_TIME_COST = int(os.getenv('PASSWORD_ARGON2_TIME_COST', 0))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv('PASSWORD_ARGON2_MEMORY_COST', 0))  # KiB
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'users.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'users.hashers.ScryptPasswordHasher',
+    'argon2': 'users.hashers.Argon2PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -378,6 +458,37 @@ CACHES = {
     }
 }
 
+# Staff dashboard analytics
+DASHBOARD_ANALYTICS_MAX_DAYS = int(os.getenv('DASHBOARD_ANALYTICS_MAX_DAYS', 365))
+DASHBOARD_ANALYTICS_CACHE_TTL = int(os.getenv('DASHBOARD_ANALYTICS_CACHE_TTL', 300))  # seconds
+DASHBOARD_STATS_CACHE_TTL = int(os.getenv('DASHBOARD_STATS_CACHE_TTL', 60))  # seconds
+# Read chart series from the DailyMetric rollup tables (run backfill_daily_metrics first)
+DASHBOARD_ANALYTICS_USE_ROLLUPS = os.getenv('DASHBOARD_ANALYTICS_USE_ROLLUPS', 'False').lower() in ('true', '1', 't')
+# Dashboard widgets (dashboard.widgets): cached per widget unless config.cache_ttl says otherwise
+DASHBOARD_WIDGET_CACHE_TTL = int(os.getenv('DASHBOARD_WIDGET_CACHE_TTL', 60))  # seconds
+
+# User activity logging (dashboard.activity): buffered in-process, written in batches
+ACTIVITY_LOG_BUFFERED = os.getenv('ACTIVITY_LOG_BUFFERED', 'True').lower() in ('true', '1', 't')
+ACTIVITY_BUFFER_SIZE = int(os.getenv('ACTIVITY_BUFFER_SIZE', 10000))  # events held before dropping
+ACTIVITY_FLUSH_BATCH = int(os.getenv('ACTIVITY_FLUSH_BATCH', 200))
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv('ACTIVITY_FLUSH_INTERVAL', 2.0))  # seconds
+# Retention: older rows are moved to gzip'd NDJSON files by `manage.py archive_activities`
+ACTIVITY_RETENTION_DAYS = int(os.getenv('ACTIVITY_RETENTION_DAYS', 180))
+ACTIVITY_ARCHIVE_DIR = os.getenv('ACTIVITY_ARCHIVE_DIR', BASE_DIR / 'archive' / 'activities')
+
+# Unread notification counters are cached per user and recounted at least this often
+NOTIFICATION_UNREAD_RECONCILE = int(os.getenv('NOTIFICATION_UNREAD_RECONCILE', 3600))  # seconds
+
+# Cache-backed pub/sub (core.pubsub), the notification SSE stream and the payment long-poll (ASGI only)
+PUBSUB_POLL_INTERVAL = float(os.getenv('PUBSUB_POLL_INTERVAL', 0.5))  # seconds
+PUBSUB_MESSAGE_TTL = int(os.getenv('PUBSUB_MESSAGE_TTL', 60))  # seconds
+PUBSUB_MAX_BACKLOG = int(os.getenv('PUBSUB_MAX_BACKLOG', 100))  # messages replayed to a lagging subscriber
+SSE_MAX_CONNECTIONS = int(os.getenv('SSE_MAX_CONNECTIONS', 500))  # open streams per worker process
+SSE_HEARTBEAT = int(os.getenv('SSE_HEARTBEAT', 15))  # seconds
+SSE_RETRY_MS = int(os.getenv('SSE_RETRY_MS', 5000))  # client reconnect delay
+PAYMENT_LONGPOLL_TIMEOUT = int(os.getenv('PAYMENT_LONGPOLL_TIMEOUT', 25))  # max seconds a status request is held
+PAYMENT_POLL_INTERVAL = int(os.getenv('PAYMENT_POLL_INTERVAL', 5))  # seconds between status requests under WSGI
+
 # Session settings
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 SESSION_COOKIE_AGE = 86400  # 1 day
@@ -9,6 +9,7 @@ api_v1_patterns = [
     path("users/", include('users.api.routers')),
     path("memberships/", include('memberships.api.routers')),
     path("association/", include('association.api.routers')),
+    path("dashboard/", include('dashboard.api.routers')),
     path('auth/', include('social_django.urls', namespace='social')),
     path('', lambda request: redirect('/auth/login/')),
 
@@ -6,6 +6,7 @@ urlpatterns = [
     path("send-otp/", views.send_otp),
     path("verify-otp/", views.verify_otp),
     path("login/", views.login),
+    path("refresh/", views.refresh),
     path("logout/", views.logout),
     path("forgot-password/", views.forgot_password),
     path("reset-password/", views.reset_password),
@@ -1,8 +1,7 @@
 from django.contrib.auth import authenticate, password_validation, get_user_model
-from django.utils import timezone
 from rest_framework import serializers
-from users.models import Profile
-from core.utils.otp import generate_otp, expiry
+from users.services.registration import RegistrationError, register_user
+from core.utils.otp import check_otp
 
 User = get_user_model()
 
@@ -22,28 +21,13 @@ class RegisterSerializer(serializers.Serializer):
         return attrs
 
     def create(self, validated):
-        user = User.objects.create_user(
-            username=validated["username"], email=validated["email"], password=validated["password"]
-        )
-        print('user', user)
-        prof_data = validated["profile"]
-        profile = getattr(user, "profile", None) or Profile.objects.get_or_create(user=user)[0]
-
-        for field in ["full_name", "mobile", "secondary_mobile"]:
-            if field in prof_data:
-                setattr(profile, field, prof_data[field])
-            # avatar might be a file in multipart—leave to your view; if JSON URL, you can assign string
-        if "avatar" in prof_data:
-            profile.avatar = prof_data["avatar"]
-        profile.save()
-
-        # Profile.objects.create(user=user, **validated["profile"])
-        code = generate_otp()
-        user.otp_code = code
-        user.otp_expired_at = expiry(10)
-        user.is_verified = False
-        user.is_locked = True
-        user.save()
+        # one transaction: user + profile inserts, OTP to the cache, email sent
+        try:
+            user, code = register_user(
+                validated["username"], validated["email"], validated["password"], profile=validated["profile"]
+            )
+        except RegistrationError as exc:
+            raise serializers.ValidationError(exc.errors)
         self.context["otp_code"] = code
         return user
 
@@ -58,12 +42,9 @@ class VerifyOtpSerializer(serializers.Serializer):
             user = User.objects.get(email=attrs["email"])
         except User.DoesNotExist:
             raise serializers.ValidationError("User not found.")
-        if not user.otp_code or not user.otp_expired_at:
-            raise serializers.ValidationError("No OTP requested.")
-        if timezone.now() > user.otp_expired_at:
-            raise serializers.ValidationError("OTP expired.")
-        if user.otp_code != attrs["code"]:
-            raise serializers.ValidationError("Invalid OTP.")
+        error = check_otp(user, attrs["code"])
+        if error:
+            raise serializers.ValidationError(error)
         attrs["user"] = user
         return attrs
 
@@ -73,13 +54,8 @@ class LoginSerializer(serializers.Serializer):
     def validate(self, attrs):
         ident = attrs["identifier"]
         pwd = attrs["password"]
-        user = authenticate(username=ident, password=pwd)
-        if not user:
-            try:
-                u = User.objects.get(email=ident)
-            except User.DoesNotExist:
-                raise serializers.ValidationError("Invalid credentials.")
-            user = authenticate(username=u.username, password=pwd)
+        # username or email, resolved in one query by users.backends.UsernameOrEmailBackend
+        user = authenticate(self.context.get("request"), username=ident, password=pwd)
         if not user:
             raise serializers.ValidationError("Invalid credentials.")
         if not user.is_verified:
@@ -1,17 +1,21 @@
+import requests
 from django.contrib.auth import get_user_model
-from django.utils import timezone
-from django.db import transaction
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from google.auth.exceptions import GoogleAuthError
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample, inline_serializer
 
 from core.api_schemas import UserPrivateEnvelopeSerializer, OkEnvelopeSerializer, TokensEnvelopeSerializer
 from core.responses import ok, fail
+from core.throttling import (
+    LoginThrottle, OtpSendThrottle, OtpVerifyThrottle, RefreshThrottle, RegisterThrottle
+)
 from core.utils.emailer import send_otp_email, send_username_email
-from core.utils.otp import generate_otp, expiry
+from core.utils.otp import check_otp, issue_otp
 from core.utils.google_auth import verify_google_id_token
 from users.models import Profile
+from users.tokens import RefreshToken, issue_tokens, rotate_refresh
 from .serializers import (
     RegisterSerializer, SendOtpSerializer, VerifyOtpSerializer, LoginSerializer,
     ForgotPasswordSerializer, ResetPasswordSerializer, ForgotUsernameSerializer,
@@ -40,12 +44,11 @@ User = get_user_model()
     ],
 )
 @api_view(["POST"])
+@throttle_classes([RegisterThrottle])
 def register(request):
     ser = RegisterSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
-    with transaction.atomic():
-        user = ser.save()
-        send_otp_email(user.email, ser.context["otp_code"])
+    user = ser.save()
     return ok({"user": {"username": user.username, "email": user.email}}, "Registered. OTP sent.", 201)
 
 @extend_schema(
@@ -55,6 +58,7 @@ def register(request):
     examples=[OpenApiExample("SendOtp", value={"email": "jdoe@example.com"}, request_only=True)],
 )
 @api_view(["POST"])
+@throttle_classes([OtpSendThrottle])
 def send_otp(request):
     ser = SendOtpSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
@@ -62,12 +66,7 @@ def send_otp(request):
         user = User.objects.get(email=ser.validated_data["email"])
     except User.DoesNotExist:
         return fail({"email": ["User not found."]}, status=404)
-    code = generate_otp()
-    user.otp_code = code
-    user.otp_expired_at = expiry(10)
-    user.is_locked = True
-    user.save()
-    send_otp_email(user.email, code)
+    send_otp_email(user.email, issue_otp(user))
     return ok(message="OTP sent.")
 
 @extend_schema(
@@ -77,6 +76,7 @@ def send_otp(request):
     examples=[OpenApiExample("VerifyOtp", value={"email": "jdoe@example.com", "code": "0421"}, request_only=True)],
 )
 @api_view(["POST"])
+@throttle_classes([OtpVerifyThrottle])
 def verify_otp(request):
     ser = VerifyOtpSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
@@ -95,12 +95,35 @@ def verify_otp(request):
     examples=[OpenApiExample("Login", value={"identifier": "jdoe", "password": "StrongPass123!"}, request_only=True)],
 )
 @api_view(["POST"])
+@throttle_classes([LoginThrottle])
 def login(request):
-    ser = LoginSerializer(data=request.data)
+    ser = LoginSerializer(data=request.data, context={"request": request})
     ser.is_valid(raise_exception=True)
     user = ser.validated_data["user"]
-    refresh = RefreshToken.for_user(user)
-    return ok({"access": str(refresh.access_token), "refresh": str(refresh)},"Logged in.")
+    return ok(issue_tokens(user), "Logged in.")
+
+
+@extend_schema(
+    tags=["Auth"],
+    request=inline_serializer(
+        name="RefreshRequest",
+        fields={"refresh": serializers.CharField()}
+    ),
+    responses={200: TokensEnvelopeSerializer},
+    examples=[OpenApiExample("Refresh", value={"refresh": "REFRESH_TOKEN_HERE"}, request_only=True)],
+)
+@api_view(["POST"])
+@authentication_classes([])  # the (expired) access token a client may still send is irrelevant here
+@throttle_classes([RefreshThrottle])
+def refresh(request):
+    token = request.data.get("refresh")
+    if not token:
+        return fail({"refresh": ["This field is required."]})
+    try:
+        data = rotate_refresh(token)
+    except TokenError as exc:
+        return fail(str(exc), message="Invalid refresh token.", status=401)
+    return ok(data, "Token refreshed.")
 
 
 @extend_schema(
@@ -132,6 +155,7 @@ def logout(request):
     examples=[OpenApiExample("ForgotPassword", value={"email": "jdoe@example.com"}, request_only=True)],
 )
 @api_view(["POST"])
+@throttle_classes([OtpSendThrottle])
 def forgot_password(request):
     ser = ForgotPasswordSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
@@ -139,12 +163,7 @@ def forgot_password(request):
         user = User.objects.get(email=ser.validated_data["email"])
     except User.DoesNotExist:
         return ok(message="If the email exists, an OTP has been sent.")
-    code = generate_otp()
-    user.otp_code = code
-    user.otp_expired_at = expiry(10)
-    user.is_locked = True
-    user.save()
-    send_otp_email(user.email, code)
+    send_otp_email(user.email, issue_otp(user))
     return ok(message="OTP sent to email.")
 
 
@@ -155,6 +174,7 @@ def forgot_password(request):
     examples=[OpenApiExample("ResetPassword", value={"email": "jdoe@example.com", "code": "0421", "new_password": "NewStrongPass!1"}, request_only=True)],
 )
 @api_view(["POST"])
+@throttle_classes([OtpVerifyThrottle])
 def reset_password(request):
     ser = ResetPasswordSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
@@ -162,7 +182,7 @@ def reset_password(request):
         user = User.objects.get(email=ser.validated_data["email"])
     except User.DoesNotExist:
         return fail("Invalid code or email.")
-    if user.otp_code != ser.validated_data["code"] or not user.otp_expired_at or timezone.now() > user.otp_expired_at:
+    if check_otp(user, ser.validated_data["code"]):
         return fail("Invalid or expired OTP.")
     user.set_password(ser.validated_data["new_password"])
     user.is_locked = False
@@ -179,6 +199,7 @@ def reset_password(request):
     examples=[OpenApiExample("ForgotUsername", value={"email": "jdoe@example.com"}, request_only=True)],
 )
 @api_view(["POST"])
+@throttle_classes([OtpSendThrottle])
 def forgot_username(request):
     ser = ForgotUsernameSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
@@ -197,10 +218,17 @@ def forgot_username(request):
     examples=[OpenApiExample("GoogleLogin", value={"id_token": "GOOGLE_ID_TOKEN"}, request_only=True)],
 )
 @api_view(["POST"])
+@throttle_classes([LoginThrottle])
 def google_login(request):
     ser = GoogleLoginSerializer(data=request.data)
     ser.is_valid(raise_exception=True)
-    info = verify_google_id_token(ser.validated_data["id_token"])
+    try:
+        info = verify_google_id_token(ser.validated_data["id_token"])
+    except requests.RequestException:
+        # Google's certificates could not be fetched; not the client's fault
+        return fail("Could not reach Google to verify the token.", message="Google sign-in unavailable.", status=503)
+    except (ValueError, GoogleAuthError) as exc:
+        return fail(str(exc), message="Invalid Google token.", status=400)
     email = info.get("email")
     if not email:
         return fail("Google token missing email.", status=400)
@@ -220,8 +248,7 @@ def google_login(request):
     #
     # if created and not hasattr(user, "profile"):
     #     Profile.objects.create(user=user, full_name=info.get("name") or user.username, mobile="")
-    refresh = RefreshToken.for_user(user)
-    return ok({"access": str(refresh.access_token), "refresh": str(refresh)}, "Google login successful.")
+    return ok(issue_tokens(user), "Google login successful.")
 
 
 @extend_schema(
@@ -8,34 +8,26 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth import get_user_model
-from django.utils import timezone
 from dashboard.views import dashboard_router
 import json
 
-from core.utils.otp import generate_otp, expiry
-from core.utils.emailer import send_otp_email
-from users.models import Profile
+from core.throttling import throttle
+from core.utils.otp import check_otp
+from users.services.registration import RegistrationError, register_user
 
 User = get_user_model()
 
 
+@throttle('login', identifier='username')
 def login_view(request):
     """Django template-based login view"""
     if request.method == 'POST':
         identifier = request.POST.get('username')
         password = request.POST.get('password')
 
-        # Try to authenticate with username first
+        # Username or email (users.backends.UsernameOrEmailBackend)
         user = authenticate(request, username=identifier, password=password)
 
-        # If that fails, try with email
-        if not user:
-            try:
-                user_obj = User.objects.get(email=identifier)
-                user = authenticate(request, username=user_obj.username, password=password)
-            except User.DoesNotExist:
-                pass
-
         if user:
             if not user.is_verified:
                 messages.error(request, 'Please verify your email to access your account.')
@@ -61,6 +53,7 @@ def login_view(request):
     return render(request, 'auth/login.html')
 
 
+@throttle('register', identifier='email')
 def register_view(request):
     """Django template-based registration view"""
     if request.method == 'POST':
@@ -72,12 +65,6 @@ def register_view(request):
         # Validation
         errors = {}
 
-        if User.objects.filter(username=username).exists():
-            errors['username'] = 'Username already exists.'
-
-        if User.objects.filter(email=email).exists():
-            errors['email'] = 'Email already exists.'
-
         if password1 != password2:
             errors['password2'] = 'Passwords do not match.'
 
@@ -90,32 +77,14 @@ def register_view(request):
                 'form_data': request.POST
             })
 
-        # Create user
-        user = User.objects.create_user(
-            username=username,
-            email=email,
-            password=password1
-        )
-
-        # Generate OTP
-        code = generate_otp()
-        user.otp_code = code
-        user.otp_expired_at = expiry(10)
-        user.is_verified = False
-        user.is_locked = True
-        user.save()
-
-        # Create profile
-        Profile.objects.get_or_create(
-            user=user,
-            defaults={
-                'full_name': username,
-                'mobile': ''
-            }
-        )
-
-        # Send OTP email
-        send_otp_email(user.email, code)
+        # Create user and profile, send OTP email (duplicates are caught by the DB constraints)
+        try:
+            register_user(username, email, password1)
+        except RegistrationError as exc:
+            return render(request, 'auth/register.html', {
+                'errors': {field: msgs[0] for field, msgs in exc.errors.items()},
+                'form_data': request.POST
+            })
 
         messages.success(request, 'Registration successful! Please check your email for verification code.')
         return redirect('verify_otp')
@@ -123,6 +92,7 @@ def register_view(request):
     return render(request, 'auth/register.html')
 
 
+@throttle('otp_verify', identifier='email')
 def verify_otp_view(request):
     """OTP verification view"""
     if request.method == 'POST':
@@ -135,16 +105,9 @@ def verify_otp_view(request):
             messages.error(request, 'User not found.')
             return render(request, 'auth/verify_otp.html')
 
-        if not user.otp_code or not user.otp_expired_at:
-            messages.error(request, 'No OTP requested.')
-            return render(request, 'auth/verify_otp.html')
-
-        if timezone.now() > user.otp_expired_at:
-            messages.error(request, 'OTP expired. Please request a new one.')
-            return render(request, 'auth/verify_otp.html')
-
-        if user.otp_code != code:
-            messages.error(request, 'Invalid OTP.')
+        error = check_otp(user, code)
+        if error:
+            messages.error(request, error)
             return render(request, 'auth/verify_otp.html')
 
         # Verify user
@@ -187,6 +150,7 @@ def logout_view(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@throttle('login', identifier='identifier')
 def api_login(request):
     """API endpoint for React login"""
     try:
@@ -194,16 +158,9 @@ def api_login(request):
         identifier = data.get('identifier')
         password = data.get('password')
 
-        # Try authentication
+        # Username or email (users.backends.UsernameOrEmailBackend)
         user = authenticate(request, username=identifier, password=password)
 
-        if not user:
-            try:
-                user_obj = User.objects.get(email=identifier)
-                user = authenticate(request, username=user_obj.username, password=password)
-            except User.DoesNotExist:
-                pass
-
         if not user:
             return JsonResponse({
                 'success': False,
@@ -251,6 +208,7 @@ def api_login(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@throttle('register', identifier='email')
 def api_register(request):
     """API endpoint for React registration"""
     try:
@@ -260,49 +218,22 @@ def api_register(request):
         password = data.get('password')
         confirm_password = data.get('confirm_password')
 
-        # Validation
-        if User.objects.filter(username=username).exists():
-            return JsonResponse({
-                'success': False,
-                'message': 'Username already exists'
-            }, status=400)
-
-        if User.objects.filter(email=email).exists():
+        # Validation (duplicate username/email are caught by the DB constraints)
+        if password != confirm_password:
             return JsonResponse({
                 'success': False,
-                'message': 'Email already exists'
+                'message': 'Passwords do not match'
             }, status=400)
 
-        if password != confirm_password:
+        # Create user and profile, send OTP
+        try:
+            user, _ = register_user(username, email, password)
+        except RegistrationError as exc:
             return JsonResponse({
                 'success': False,
-                'message': 'Passwords do not match'
+                'message': next(iter(exc.errors.values()))[0].rstrip('.')
             }, status=400)
 
-        # Create user
-        user = User.objects.create_user(
-            username=username,
-            email=email,
-            password=password
-        )
-
-        # Generate OTP
-        code = generate_otp()
-        user.otp_code = code
-        user.otp_expired_at = expiry(10)
-        user.is_verified = False
-        user.is_locked = True
-        user.save()
-
-        # Create profile
-        Profile.objects.get_or_create(
-            user=user,
-            defaults={'full_name': username, 'mobile': ''}
-        )
-
-        # Send OTP
-        send_otp_email(user.email, code)
-
         return JsonResponse({
             'success': True,
             'message': 'Registration successful! Please check your email for verification code.',
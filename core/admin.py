@@ -1,6 +1,21 @@
 from django.contrib import admin
 
-from .models import Status
+from .models import Status, MailCampaign, MailDelivery
 
 
 admin.site.register(Status)
+
+
+@admin.register(MailCampaign)
+class MailCampaignAdmin(admin.ModelAdmin):
+    list_display = ("name", "subject", "status", "total_recipients", "sent_count", "failed_count", "created_at")
+    list_filter = ("status",)
+    readonly_fields = ("total_recipients", "sent_count", "failed_count", "started_at", "finished_at")
+
+
+@admin.register(MailDelivery)
+class MailDeliveryAdmin(admin.ModelAdmin):
+    list_display = ("campaign", "email", "status", "attempts", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("email",)
+    raw_id_fields = ("campaign", "user")
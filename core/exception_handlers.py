@@ -5,4 +5,8 @@ def enveloped_exception_handler(exc, context):
     response = exception_handler(exc, context)
     if response is None:
         return None
-    return fail(error=response.data, message="Request failed", status=response.status_code)
+    enveloped = fail(error=response.data, message="Request failed", status=response.status_code)
+    # keep Retry-After (throttling) and WWW-Authenticate
+    for header, value in response.items():
+        enveloped[header] = value
+    return enveloped
@@ -0,0 +1,41 @@
+# core/management/commands/queue_mail_campaign.py
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.mailing import create_campaign, enqueue_recipients
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Create a bulk mail campaign and queue its recipients (sent by send_mail_campaigns)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subject", required=True)
+        parser.add_argument("--name", default="")
+        parser.add_argument("--template", default=None, help="Template name, defaults to the announcement template")
+        parser.add_argument("--heading", default="")
+        parser.add_argument("--body", default="")
+        parser.add_argument("--audience", choices=["all", "members", "staff"], default="members")
+        parser.add_argument("--status", nargs="*", default=[],
+                            help="Membership workflow status codes to target (members audience only)")
+
+    def handle(self, *args, **opts):
+        users = User.objects.filter(is_active=True)
+        if opts["audience"] == "staff":
+            users = users.filter(is_staff=True)
+        elif opts["audience"] == "members":
+            users = users.filter(membership__isnull=False)
+            if opts["status"]:
+                users = users.filter(membership__workflow_status__status_code__in=opts["status"])
+        elif opts["status"]:
+            raise CommandError("--status can only be used with --audience members")
+
+        campaign = create_campaign(
+            opts["subject"],
+            name=opts["name"],
+            template_name=opts["template"],
+            context={"heading": opts["heading"], "body": opts["body"]},
+        )
+        total = enqueue_recipients(campaign, users)
+        self.stdout.write(self.style.SUCCESS(f"Queued campaign {campaign.pk} with {total} recipients"))
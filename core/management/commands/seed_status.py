@@ -57,6 +57,13 @@ class Command(BaseCommand):
                 'description': 'Membership terminated',
                 'parent_code': '1',
             },
+            {
+                'status_code': '17',
+                'internal_status': 'Lapsed',
+                'external_status': 'Lapsed',
+                'description': 'Membership expired without renewal',
+                'parent_code': '1',
+            },
         ]
 
         parent_status = Status.objects.get_or_create(
@@ -0,0 +1,46 @@
+# core/management/commands/send_mail_campaigns.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import MailCampaign
+from core.services.mailing import send_campaign
+
+
+class Command(BaseCommand):
+    help = "Send queued bulk mail campaigns. Safe to re-run: sending resumes from the delivery ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--campaign", type=int, help="Only send this campaign id")
+        parser.add_argument("--connections", type=int, help="Number of persistent SMTP connections")
+        parser.add_argument("--rate", type=float, help="Maximum messages per second (0 = unthrottled)")
+        parser.add_argument("--chunk-size", type=int, help="Recipients loaded and recorded per batch")
+        parser.add_argument("--loop", type=int, default=0,
+                            help="Keep polling for queued campaigns every N seconds")
+
+    def handle(self, *args, **opts):
+        while True:
+            campaigns = MailCampaign.objects.filter(status__in=["queued", "sending"]).order_by("id")
+            if opts["campaign"]:
+                campaigns = MailCampaign.objects.filter(pk=opts["campaign"])
+                if not campaigns.exists():
+                    raise CommandError(f"Campaign {opts['campaign']} not found")
+
+            for campaign in campaigns:
+                result = send_campaign(
+                    campaign,
+                    connections=opts["connections"],
+                    rate=opts["rate"],
+                    chunk_size=opts["chunk_size"],
+                )
+                if not result["claimed"]:
+                    self.stdout.write(f"Campaign {result['campaign']}: being sent by another runner, skipped")
+                    continue
+                self.stdout.write(self.style.SUCCESS(
+                    f"Campaign {result['campaign']}: sent {result['sent']}, failed {result['failed']}, "
+                    f"status {result['status']} in {result['elapsed']}s"
+                ))
+
+            if not opts["loop"]:
+                break
+            time.sleep(opts["loop"])
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.throttling import reset_throttle_stats, throttle_stats
+
+
+class Command(BaseCommand):
+    help = "Show how many requests each throttle scope allowed and refused (by limit)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("scopes", nargs="*", help="Scopes to show (default: all in THROTTLE_RATES)")
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after showing them")
+
+    def handle(self, *args, **opts):
+        stats = throttle_stats(opts["scopes"])
+        for scope, counts in stats.items():
+            denied = counts["denied"]
+            self.stdout.write(
+                f"{scope}: {counts['allowed']} allowed, {sum(denied.values())} throttled "
+                f"(ip {denied['ip']}, identifier {denied['identifier']}, route {denied['route']})"
+            )
+        if opts["reset"]:
+            reset_throttle_stats(opts["scopes"])
+            self.stdout.write(self.style.SUCCESS("Counters reset"))
@@ -56,3 +56,67 @@ class Status(AuditModel):
     def __str__(self):
         status = self.parent.internal_status if self.parent else ''
         return f'{status} - {self.internal_status}'
+
+
+class MailCampaign(AuditModel):
+    """A bulk email sent to an audience of users"""
+    STATUS_CHOICES = (
+        ("draft", "Draft"),
+        ("queued", "Queued"),
+        ("sending", "Sending"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    )
+
+    name = models.CharField(max_length=200)
+    subject = models.CharField(max_length=255)
+    template_name = models.CharField(max_length=255, default="mailing/email/announcement.html")
+    context = models.JSONField(default=dict, blank=True, help_text="Template context shared by all recipients")
+    from_email = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default="draft", db_index=True)
+
+    total_recipients = models.PositiveIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
+
+
+class MailDelivery(models.Model):
+    """
+    Per-recipient send ledger for a MailCampaign.
+    Kept deliberately lean (no AuditModel) since a campaign writes one row per member.
+    """
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    )
+
+    campaign = models.ForeignKey(MailCampaign, on_delete=models.CASCADE, related_name="deliveries")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name="+")
+    email = models.EmailField()
+    context = models.JSONField(default=dict, blank=True, help_text="Per-recipient template context")
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name_plural = "Mail deliveries"
+        constraints = [
+            models.UniqueConstraint(fields=["campaign", "email"], name="core_maildelivery_unique_recipient"),
+        ]
+        indexes = [
+            models.Index(fields=["campaign", "status", "id"], name="core_maildel_camp_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.campaign_id} -> {self.email} ({self.status})"
@@ -0,0 +1,90 @@
+# core/pubsub.py
+"""
+Minimal publish/subscribe over the Django cache.
+
+Each channel is a sequence counter plus one short-lived cache key per message.
+Publishers bump the counter; subscribers remember the last sequence they saw
+and poll the counter (one cache GET) every PUBSUB_POLL_INTERVAL seconds,
+fetching the missed messages in one get_many when it moves. With the Redis
+cache this works across workers; with LocMemCache only within one process.
+
+Messages must be JSON/pickle-able and small: they are hints ("something
+changed for user 42"), not a durable queue; anything older than
+PUBSUB_MESSAGE_TTL seconds is gone.
+
+Views that wait on listen() should check under_asgi() first: under WSGI the
+wait holds a worker thread for its whole duration.
+"""
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+
+
+def under_asgi(request) -> bool:
+    """True when ``request`` is served through BMR.asgi, where a held request costs a coroutine, not a thread"""
+    return isinstance(request, ASGIRequest)
+
+
+def _seq_key(channel):
+    return f"pubsub:{channel}:seq"
+
+
+def _message_key(channel, seq):
+    return f"pubsub:{channel}:{seq}"
+
+
+def publish(channel: str, message) -> int:
+    """Append ``message`` to ``channel`` and return its sequence number"""
+    cache.add(_seq_key(channel), 0, None)
+    try:
+        seq = cache.incr(_seq_key(channel))
+    except ValueError:  # evicted between add and incr
+        cache.set(_seq_key(channel), 1, None)
+        seq = 1
+    cache.set(_message_key(channel, seq), message, settings.PUBSUB_MESSAGE_TTL)
+    return seq
+
+
+def current_seq(channel: str) -> int:
+    return cache.get(_seq_key(channel)) or 0
+
+
+async def acurrent_seq(channel: str) -> int:
+    return await cache.aget(_seq_key(channel)) or 0
+
+
+async def _afetch(channel, after, seq):
+    if seq <= after:
+        return []
+    # a subscriber that fell far behind only gets the most recent messages
+    first = max(after + 1, seq - settings.PUBSUB_MAX_BACKLOG + 1)
+    keys = [_message_key(channel, n) for n in range(first, seq + 1)]
+    found = await cache.aget_many(keys)
+    return [found[key] for key in keys if key in found]
+
+
+async def listen(channels: dict, timeout: float):
+    """
+    Wait until any of ``channels`` ({channel: last seen seq}) moves past its
+    sequence or ``timeout`` seconds pass. Returns ({channel: new seq},
+    [(channel, message), ...]); the message list is empty on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        seqs = await cache.aget_many([_seq_key(channel) for channel in channels])
+        latest = {channel: seqs.get(_seq_key(channel)) or 0 for channel in channels}
+        messages = []
+        for channel, after in channels.items():
+            if latest[channel] < after:  # counter was reset (cache flush or eviction)
+                after = 0
+            for message in await _afetch(channel, after, latest[channel]):
+                messages.append((channel, message))
+        if messages or latest != channels:
+            return latest, messages
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return latest, []
+        await asyncio.sleep(min(settings.PUBSUB_POLL_INTERVAL, remaining))
@@ -0,0 +1,306 @@
+# core/services/mailing.py
+"""
+Bulk mailing engine.
+
+Campaigns are queued from a web request or the shell (cheap: recipients are
+streamed into the MailDelivery ledger in chunks) and sent out of band by the
+``send_mail_campaigns`` management command, so a web worker never talks SMTP
+for more than one message.
+
+Sending renders each recipient's message from the campaign template and pushes
+it through a bounded pool of persistent SMTP connections, throttled to a global
+rate. Progress is written back to the ledger every BULK_MAIL_PROGRESS_EVERY
+messages, so a crashed run resumes from the first pending recipient and re-sends
+at most that many. A runner claims a campaign before sending it; another runner
+only takes it over once the claim has seen no progress for
+BULK_MAIL_CLAIM_TIMEOUT seconds.
+"""
+import logging
+import queue
+import re
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Count, F, Q
+from django.db.models.functions import Coalesce
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from core.models import MailCampaign, MailDelivery
+from core.utils.batching import chunked_values
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class RateLimiter:
+    """Spread calls evenly so that at most ``rate`` happen per second across all threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class SMTPConnectionPool:
+    """
+    At most ``size`` open email backend connections, opened lazily and reused
+    for every message until the pool is closed.
+    """
+
+    def __init__(self, size: int, backend: str | None = None):
+        self.size = max(1, size)
+        self.backend = backend
+        self._idle = queue.LifoQueue()
+        self._opened = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._opened) < self.size:
+                connection = get_connection(self.backend, fail_silently=False)
+                connection.open()
+                self._opened.append(connection)
+                return connection
+        return self._idle.get()
+
+    def release(self, connection):
+        self._idle.put(connection)
+
+    def close(self):
+        for connection in self._opened:
+            try:
+                connection.close()
+            except Exception as e:
+                logger.warning(f"Error closing mail connection: {e}")
+        self._opened = []
+
+
+def create_campaign(subject: str, *, name: str = "", template_name: str | None = None,
+                    context: dict | None = None, from_email: str = "") -> MailCampaign:
+    campaign = MailCampaign(
+        name=name or subject,
+        subject=subject,
+        context=context or {},
+        from_email=from_email,
+    )
+    if template_name:
+        campaign.template_name = template_name
+    campaign.save()
+    return campaign
+
+
+def add_recipients(campaign: MailCampaign, recipients) -> None:
+    """
+    Bulk insert ledger rows from an iterable of (user_id, email, context) tuples.
+    Recipients already in the ledger are skipped.
+    """
+    MailDelivery.objects.bulk_create(
+        [MailDelivery(campaign=campaign, user_id=user_id, email=email, context=context or {})
+         for user_id, email, context in recipients],
+        ignore_conflicts=True,
+    )
+
+
+def mark_queued(campaign: MailCampaign) -> int:
+    """Hand the campaign over to send_mail_campaigns. Returns its number of recipients."""
+    campaign.total_recipients = campaign.deliveries.count()
+    campaign.status = "queued"
+    campaign.save(update_fields=["total_recipients", "status", "modified_at", "modified_by"])
+    return campaign.total_recipients
+
+
+def enqueue_recipients(campaign: MailCampaign, users, *, context: dict | None = None,
+                       chunk_size: int | None = None) -> int:
+    """
+    Add every user in ``users`` (a User queryset) to the campaign ledger and queue it.
+    Safe to call repeatedly. Returns the campaign's total number of recipients.
+    """
+    chunk_size = chunk_size or _setting("BULK_MAIL_CHUNK_SIZE", 500)
+    users = users.exclude(email__isnull=True).exclude(email="")
+
+    for rows in chunked_values(users, "email", chunk_size=chunk_size):
+        add_recipients(campaign, ((pk, email, context) for pk, email in rows))
+
+    return mark_queued(campaign)
+
+
+def _html_to_text(html):
+    text = re.sub(r"<br\s*/?>|</p>|</h\d>", "\n", html, flags=re.IGNORECASE)
+    lines = (line.strip() for line in strip_tags(text).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _build_message(campaign, template, from_email, delivery):
+    context = {**campaign.context, **delivery.context}
+    context.update({"user": delivery.user, "email": delivery.email, "campaign": campaign})
+    html = template.render(context)
+    message = EmailMultiAlternatives(campaign.subject, _html_to_text(html), from_email, [delivery.email])
+    message.attach_alternative(html, "text/html")
+    return message
+
+
+def _deliver(pool, limiter, message):
+    limiter.wait()
+    connection = None
+    try:
+        connection = pool.acquire()
+        try:
+            connection.send_messages([message])
+        except smtplib.SMTPServerDisconnected:
+            # Long-lived connections get dropped by the server; reconnect once
+            connection.close()
+            connection.open()
+            connection.send_messages([message])
+        return None
+    except Exception as e:
+        return str(e) or e.__class__.__name__
+    finally:
+        if connection is not None:
+            pool.release(connection)
+
+
+def _record_results(results, max_attempts):
+    """Write (delivery, error) outcomes back to the ledger"""
+    now = timezone.now()
+    sent_ids = [d.id for d, error in results if error is None]
+    if sent_ids:
+        MailDelivery.objects.filter(id__in=sent_ids).update(
+            status="sent", sent_at=now, error=None, attempts=F("attempts") + 1
+        )
+
+    failed = []
+    for delivery, error in results:
+        if error is None:
+            continue
+        delivery.attempts += 1
+        delivery.error = error[:1000]
+        delivery.status = "failed" if delivery.attempts >= max_attempts else "pending"
+        failed.append(delivery)
+    if failed:
+        MailDelivery.objects.bulk_update(failed, ["status", "attempts", "error"])
+    return len(sent_ids), len(failed)
+
+
+def refresh_campaign_counts(campaign: MailCampaign) -> MailCampaign:
+    counts = campaign.deliveries.aggregate(
+        total=Count("id"),
+        sent=Count("id", filter=Q(status="sent")),
+        failed=Count("id", filter=Q(status="failed")),
+        pending=Count("id", filter=Q(status="pending")),
+    )
+    campaign.total_recipients = counts["total"]
+    campaign.sent_count = counts["sent"]
+    campaign.failed_count = counts["failed"]
+    if counts["pending"]:
+        campaign.status = "queued"
+    else:
+        campaign.status = "completed" if counts["sent"] or not counts["failed"] else "failed"
+        campaign.finished_at = timezone.now()
+    campaign.save(update_fields=["total_recipients", "sent_count", "failed_count", "status",
+                                 "finished_at", "modified_at", "modified_by"])
+    return campaign
+
+
+def claim_campaign(campaign: MailCampaign) -> bool:
+    """
+    Mark ``campaign`` as being sent by the caller. False when another runner
+    holds it, i.e. it is "sending" and has made progress within
+    BULK_MAIL_CLAIM_TIMEOUT seconds.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=_setting("BULK_MAIL_CLAIM_TIMEOUT", 600))
+    claimed = MailCampaign.objects.filter(
+        ~Q(status="sending") | Q(modified_at__lt=stale), pk=campaign.pk,
+    ).update(status="sending", started_at=Coalesce("started_at", now), modified_at=now)
+    if claimed:
+        campaign.refresh_from_db(fields=["status", "started_at", "modified_at"])
+    return bool(claimed)
+
+
+def _heartbeat(campaign):
+    MailCampaign.objects.filter(pk=campaign.pk).update(modified_at=timezone.now())
+
+
+def send_campaign(campaign: MailCampaign, *, connections: int | None = None, rate: float | None = None,
+                  chunk_size: int | None = None, max_attempts: int | None = None) -> dict:
+    """
+    Send every pending recipient of ``campaign``. Returns counts and elapsed time
+    ("claimed" is False, and nothing is sent, when another runner is sending it).
+    Recipients that fail are retried on later runs until ``max_attempts`` is reached.
+    """
+    connections = connections or _setting("BULK_MAIL_CONNECTIONS", 4)
+    rate = _setting("BULK_MAIL_RATE", 20) if rate is None else rate
+    chunk_size = chunk_size or _setting("BULK_MAIL_CHUNK_SIZE", 500)
+    max_attempts = max_attempts or _setting("BULK_MAIL_MAX_ATTEMPTS", 3)
+    progress_every = max(1, _setting("BULK_MAIL_PROGRESS_EVERY", 50))
+
+    started = time.monotonic()
+    if not claim_campaign(campaign):
+        logger.info(f"Campaign {campaign.pk} is being sent by another runner")
+        return {"campaign": campaign.pk, "claimed": False, "sent": 0, "failed": 0,
+                "status": campaign.status, "elapsed": round(time.monotonic() - started, 2)}
+
+    template = get_template(campaign.template_name)
+    from_email = campaign.from_email or settings.DEFAULT_FROM_EMAIL
+    limiter = RateLimiter(rate)
+    pool = SMTPConnectionPool(connections)
+    pending = campaign.deliveries.filter(status="pending", attempts__lt=max_attempts).select_related("user")
+    sent = failed = 0
+    last_id = 0
+
+    try:
+        with ThreadPoolExecutor(max_workers=pool.size, thread_name_prefix="bulk-mail") as executor:
+            while True:
+                batch = list(pending.filter(id__gt=last_id).order_by("id")[:chunk_size])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                messages = [_build_message(campaign, template, from_email, d) for d in batch]
+                outcomes = zip(batch, executor.map(lambda m: _deliver(pool, limiter, m), messages))
+                done = []
+                for result in outcomes:
+                    done.append(result)
+                    if len(done) == progress_every or result[0] is batch[-1]:
+                        batch_sent, batch_failed = _record_results(done, max_attempts)
+                        sent += batch_sent
+                        failed += batch_failed
+                        done = []
+                        _heartbeat(campaign)
+                logger.info(f"Campaign {campaign.pk}: sent {sent}, failed {failed}")
+    finally:
+        pool.close()
+        refresh_campaign_counts(campaign)
+
+    return {
+        "campaign": campaign.pk,
+        "claimed": True,
+        "sent": sent,
+        "failed": failed,
+        "status": campaign.status,
+        "elapsed": round(time.monotonic() - started, 2),
+    }
@@ -0,0 +1,247 @@
+# core/throttling.py
+"""
+Request throttling over the Django cache.
+
+Every limit is a sliding-window counter: hits are counted in fixed windows of
+``period`` seconds (one cache key per window, created with add() and bumped
+with incr(), both atomic on Redis), and the count for the last ``period``
+seconds is estimated as the current window plus the previous one weighted by
+how much of it still overlaps. Two small keys per client instead of a list of
+timestamps, at the price of assuming the previous window's hits were spread
+evenly.
+
+THROTTLE_RATES maps a scope ("login", "otp_send", ...) to its limits, keyed by
+what they count:
+
+    "ip"          per client address
+    "identifier"  per submitted username/email, so one account cannot be
+                  hammered from many addresses
+    "route"       across all clients of the scope
+
+A request over any of them is refused; refused requests keep counting, so a
+client that does not back off stays blocked. Allowed and refused requests are
+counted per scope (see throttle_stats() and `manage.py throttle_stats`).
+
+DRF views use the ScopedThrottle subclasses below (the enveloped 429 and its
+Retry-After header come from core.exception_handlers); plain Django views use
+the throttle() decorator.
+"""
+import hashlib
+import json
+import logging
+import math
+import re
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("ip", "identifier", "route")
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+RATE_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([smhd])[a-z]*\s*$", re.IGNORECASE)
+
+
+def parse_rate(rate):
+    """"5/10min" -> (5, 600); "20/min" -> (20, 60); "100/day" -> (100, 86400)"""
+    match = RATE_RE.match(rate or "")
+    if not match:
+        raise ValueError(f"Invalid throttle rate {rate!r}")
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * UNITS[unit.lower()]
+
+
+def client_ip(request):
+    """REMOTE_ADDR, or the address THROTTLE_NUM_PROXIES hops back in X-Forwarded-For"""
+    proxies = settings.THROTTLE_NUM_PROXIES
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+    if proxies and forwarded:
+        hops = [ip.strip() for ip in forwarded.split(",") if ip.strip()]
+        if hops:
+            return hops[-min(proxies, len(hops))]
+    return request.META.get("REMOTE_ADDR") or "unknown"
+
+
+def _digest(value):
+    # fixed-length keys that do not put emails into the cache
+    return hashlib.blake2b(str(value).strip().lower().encode(), digest_size=12).hexdigest()
+
+
+def _incr(key, timeout):
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:  # expired between add and incr
+        cache.set(key, 1, timeout)
+        return 1
+
+
+def _hit(key, limit, period):
+    """Count one hit; seconds to wait if the window is over ``limit``, else None"""
+    now = time.time()
+    window, elapsed = divmod(now, period)
+    window = int(window)
+    current = _incr(f"{key}:{window}", period * 2)
+    previous = cache.get(f"{key}:{window - 1}", 0)
+    weight = 1 - elapsed / period
+    if previous * weight + current <= limit:
+        return None
+    if current > limit or not previous:
+        return max(1, math.ceil(period - elapsed))
+    # the previous window's share shrinks as it slides out
+    return max(1, math.ceil(period * (1 - (limit - current) / previous) - elapsed))
+
+
+def _record(scope, outcome):
+    _incr(f"throttle:stats:{scope}:{outcome}", None)
+
+
+def check(scope, request, identifier=None):
+    """
+    Count a request against ``scope``'s limits. Returns None when it may
+    proceed, otherwise the seconds the client should wait.
+    """
+    limits = settings.THROTTLE_RATES.get(scope) if settings.THROTTLE_ENABLED else None
+    if not limits:
+        return None
+
+    if identifier is not None:
+        identifier = str(identifier).strip() or None
+    subjects = {"ip": client_ip(request), "identifier": identifier, "route": ""}
+    waits = {}
+    for kind in KINDS:
+        rate = limits.get(kind)
+        if not rate or subjects[kind] is None:
+            continue
+        limit, period = parse_rate(rate)
+        key = f"throttle:{scope}:{kind}:{_digest(subjects[kind])}" if kind != "route" else f"throttle:{scope}:route"
+        wait = _hit(key, limit, period)
+        if wait is not None:
+            waits[kind] = wait
+
+    if not waits:
+        _record(scope, "allowed")
+        return None
+    for kind in waits:
+        _record(scope, f"denied:{kind}")
+    logger.warning("Throttled %s request from %s (%s limit)", scope, subjects["ip"], ", ".join(waits))
+    return max(waits.values())
+
+
+def throttle_stats(scopes=None):
+    """{scope: {"allowed": n, "denied": {kind: n}}} from the counters check() keeps"""
+    scopes = list(scopes or settings.THROTTLE_RATES)
+    keys = {
+        f"throttle:stats:{scope}:{outcome}": (scope, outcome)
+        for scope in scopes
+        for outcome in ("allowed", *(f"denied:{kind}" for kind in KINDS))
+    }
+    values = cache.get_many(list(keys))
+    stats = {scope: {"allowed": 0, "denied": dict.fromkeys(KINDS, 0)} for scope in scopes}
+    for key, (scope, outcome) in keys.items():
+        count = values.get(key, 0)
+        if outcome == "allowed":
+            stats[scope]["allowed"] = count
+        else:
+            stats[scope]["denied"][outcome.split(":", 1)[1]] = count
+    return stats
+
+
+def reset_throttle_stats(scopes=None):
+    cache.delete_many([
+        f"throttle:stats:{scope}:{outcome}"
+        for scope in (scopes or settings.THROTTLE_RATES)
+        for outcome in ("allowed", *(f"denied:{kind}" for kind in KINDS))
+    ])
+
+
+# ---- DRF ----
+
+class ScopedThrottle(BaseThrottle):
+    """Applies THROTTLE_RATES[scope]; ``identifier_field`` names the request field counted per identifier"""
+    scope = None
+    identifier_field = None
+
+    def allow_request(self, request, view):
+        identifier = None
+        if self.identifier_field and hasattr(request.data, "get"):
+            identifier = request.data.get(self.identifier_field)
+        self._wait = check(self.scope, request, identifier)
+        return self._wait is None
+
+    def wait(self):
+        return self._wait
+
+
+class LoginThrottle(ScopedThrottle):
+    scope = "login"
+    identifier_field = "identifier"
+
+
+class OtpSendThrottle(ScopedThrottle):
+    scope = "otp_send"
+    identifier_field = "email"
+
+
+class OtpVerifyThrottle(ScopedThrottle):
+    scope = "otp_verify"
+    identifier_field = "email"
+
+
+class RegisterThrottle(ScopedThrottle):
+    scope = "register"
+    identifier_field = "email"
+
+
+class RefreshThrottle(ScopedThrottle):
+    scope = "refresh"
+
+
+class LookupThrottle(ScopedThrottle):
+    scope = "lookup"
+
+
+class WebhookThrottle(ScopedThrottle):
+    """Per sender address; the callbacks are unauthenticated, so never give this scope a "route" limit"""
+    scope = "webhook"
+
+
+# ---- plain Django views ----
+
+def _posted(request, field):
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+        return data.get(field) if isinstance(data, dict) else None
+    return request.POST.get(field)
+
+
+def throttle(scope, identifier=None):
+    """
+    Decorator for plain Django views: POSTs over ``scope``'s limits get a 429
+    with Retry-After (the JSON envelope for JSON requests, plain text
+    otherwise). ``identifier`` names the form/JSON field counted per identifier.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method == "POST":
+                wait = check(scope, request, _posted(request, identifier) if identifier else None)
+                if wait is not None:
+                    message = f"Too many attempts. Try again in {wait} seconds."
+                    if request.content_type == "application/json":
+                        response = JsonResponse({"success": False, "message": message,
+                                                 "error": "throttled", "data": None}, status=429)
+                    else:
+                        response = HttpResponse(message, status=429, content_type="text/plain")
+                    response["Retry-After"] = str(wait)
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
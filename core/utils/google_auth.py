@@ -1,8 +1,112 @@
-from google.oauth2 import id_token
-from google.auth.transport import requests
+"""
+Google ID token verification against cached signing certificates.
+
+Google serves its OAuth2 signing certificates with a Cache-Control max-age
+(several hours). GoogleIdTokenVerifier keeps them in the process and in the
+shared cache until that age runs out, so a sign-in costs a local signature
+check (google.auth.jwt.decode) rather than an HTTPS round trip; the fetches
+that remain go through one pooled requests.Session. A token signed with a key
+id the cached set lacks (keys rotated early) triggers one refetch, at most
+every GOOGLE_CERTS_MIN_REFRESH seconds after the last fetch by any process (the
+fetch time travels with the shared copy). A failed fetch raises
+requests.RequestException.
+
+Tests can verify against a local key set without the network or the cache:
+GoogleIdTokenVerifier(audience="client-id", certs={"kid": "-----BEGIN CERTIFICATE-----..."}).
+"""
+import re
+import threading
+import time
+
+import requests
 from django.conf import settings
+from django.core.cache import cache
+from google.auth import exceptions, jwt
+
+CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+CACHE_KEY = "google:oauth2:certs"
+MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _http():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = requests.Session()
+    return _session
+
+
+def fetch_certs(url=CERTS_URL):
+    """(certs, max_age): {key id: PEM certificate} and the seconds it stays fresh"""
+    response = _http().get(url, timeout=settings.GOOGLE_CERTS_TIMEOUT)
+    response.raise_for_status()
+    match = MAX_AGE_RE.search(response.headers.get("Cache-Control", ""))
+    max_age = int(match.group(1)) if match else settings.GOOGLE_CERTS_DEFAULT_TTL
+    # time the response already spent in an intermediate cache
+    max_age -= int(response.headers.get("Age") or 0)
+    return response.json(), max(max_age, 0)
+
+
+class GoogleIdTokenVerifier:
+    def __init__(self, audience=None, certs=None, fetch=fetch_certs, cache_key=CACHE_KEY):
+        self.audience = audience
+        self.fetch = fetch
+        self.cache_key = cache_key
+        self._static = certs is not None
+        self._certs = certs
+        self._expires = float("inf") if self._static else 0.0
+        self._fetched = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self, refresh):
+        now = time.time()
+        if not refresh:
+            shared = cache.get(self.cache_key)
+            if shared and shared["expires"] > now:
+                self._certs, self._expires = shared["certs"], shared["expires"]
+                self._fetched = shared.get("fetched", now)
+                return
+        certs, max_age = self.fetch()
+        self._certs, self._expires, self._fetched = certs, now + max_age, now
+        if max_age:
+            cache.set(self.cache_key, {"certs": certs, "expires": now + max_age, "fetched": now}, max_age)
+
+    def certs(self, refresh=False):
+        if self._static:
+            return self._certs
+        if refresh or self._certs is None or time.time() >= self._expires:
+            with self._lock:
+                # another thread may have loaded them while this one waited
+                if refresh or self._certs is None or time.time() >= self._expires:
+                    self._load(refresh)
+        return self._certs
+
+    def verify(self, token):
+        """
+        The token's claims. Raises ValueError for a bad signature, audience or
+        expiry and GoogleAuthError for a wrong issuer, as
+        google.oauth2.id_token.verify_oauth2_token does, and
+        requests.RequestException when the certificates cannot be fetched.
+        """
+        certs = self.certs()
+        key_id = jwt.decode_header(token).get("kid")
+        if (key_id not in certs and not self._static
+                and time.time() - self._fetched > settings.GOOGLE_CERTS_MIN_REFRESH):
+            certs = self.certs(refresh=True)
+        audience = self.audience if self.audience is not None else settings.GOOGLE_OAUTH_AUDIENCE or None
+        info = jwt.decode(token, certs=certs, audience=audience)
+        if info.get("iss") not in ISSUERS:
+            raise exceptions.GoogleAuthError(f"Wrong issuer. 'iss' should be one of {ISSUERS}")
+        return info
+
+
+_verifier = GoogleIdTokenVerifier()
+
 
 def verify_google_id_token(token: str) -> dict:
-    req = requests.Request()
-    info = id_token.verify_oauth2_token(token, req, settings.GOOGLE_OAUTH_AUDIENCE or None)
-    return info
+    return _verifier.verify(token)
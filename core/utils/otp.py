@@ -1,8 +1,114 @@
-import random
+"""
+One-time codes for email verification and password resets.
+
+Codes live in the cache (OTP_STORE = "cache"): only a keyed digest is stored,
+it expires with the cache TTL, wrong guesses are counted and the code is
+dropped after OTP_MAX_ATTEMPTS, and comparisons are constant-time. Requesting
+or checking a code therefore never writes the users_user row; the caller
+saves the user once, after a successful verification.
+
+The otp_code/otp_expired_at columns remain as the fallback store, used when
+OTP_STORE = "db" or the cache cannot be written, and for codes issued before
+the switch. Wrong guesses are always counted in the cache; while it cannot be
+written no code is checked at all, rather than allowing unlimited guesses.
+"""
+import hmac
+import logging
+import secrets
 from datetime import timedelta, timezone, datetime
 
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.crypto import salted_hmac
+
+logger = logging.getLogger(__name__)
+
+
 def generate_otp() -> str:
-    return f"{random.randint(0, 9999):04d}"
+    return f"{secrets.randbelow(10000):04d}"
 
 def expiry(minutes=10):
     return datetime.now(timezone.utc) + timedelta(minutes=minutes)
+
+
+def _key(user):
+    return f"otp:{user.pk}"
+
+def _attempts_key(user):
+    return f"otp:{user.pk}:attempts"
+
+def _digest(user, code):
+    return salted_hmac("core.utils.otp", f"{user.pk}:{code}").hexdigest()
+
+
+def issue_otp(user, minutes=None) -> str:
+    """Create and store a new code for ``user`` (replacing any previous one) and return it"""
+    minutes = minutes or settings.OTP_TTL_MINUTES
+    code = generate_otp()
+    if settings.OTP_STORE == "cache":
+        try:
+            cache.set(_key(user), _digest(user, code), minutes * 60)
+            cache.delete(_attempts_key(user))
+            return code
+        except Exception:
+            logger.warning("OTP cache unavailable; storing the code on the user row", exc_info=True)
+    user.otp_code = code
+    user.otp_expired_at = expiry(minutes)
+    user.save(update_fields=["otp_code", "otp_expired_at"])
+    return code
+
+
+def _count_attempt(user):
+    """This check's attempt number, or None if the counter cannot be kept"""
+    key = _attempts_key(user)
+    try:
+        cache.add(key, 0, settings.OTP_TTL_MINUTES * 60)
+        return cache.incr(key)
+    except Exception:
+        logger.warning("OTP cache unavailable; cannot count attempts", exc_info=True)
+        return None
+
+
+def clear_otp(user):
+    """Forget the user's code; clears the fallback columns on the instance without saving"""
+    try:
+        cache.delete_many([_key(user), _attempts_key(user)])
+    except Exception:
+        logger.warning("OTP cache unavailable", exc_info=True)
+    user.otp_code = None
+    user.otp_expired_at = None
+
+
+def check_otp(user, code):
+    """
+    None if ``code`` is the user's current code, which is then used up,
+    otherwise the error message. The caller saves ``user`` after acting on a
+    successful check (that also clears a code held in the fallback columns).
+    """
+    try:
+        digest = cache.get(_key(user))
+    except Exception:
+        digest = None
+    if digest is None and not user.otp_code:
+        return "No OTP requested or OTP expired."
+    attempts = _count_attempt(user)
+    if attempts is None:
+        return "OTP verification is temporarily unavailable. Please try again later."
+    if attempts > settings.OTP_MAX_ATTEMPTS:
+        held_on_row = bool(user.otp_code)
+        clear_otp(user)
+        if held_on_row:
+            # the caller does not save on failure
+            user.save(update_fields=["otp_code", "otp_expired_at"])
+        return "Too many attempts. Please request a new OTP."
+
+    if digest is not None:
+        valid = hmac.compare_digest(digest, _digest(user, code or ""))
+    else:
+        if not user.otp_expired_at or datetime.now(timezone.utc) > user.otp_expired_at:
+            return "OTP expired."
+        valid = hmac.compare_digest(user.otp_code.encode(), str(code or "").encode())
+    if not valid:
+        return "Invalid OTP."
+    clear_otp(user)
+    return None
@@ -0,0 +1,179 @@
+# dashboard/activity.py
+"""
+Buffered UserActivity logging.
+
+log_activity() only appends to a bounded in-process queue; a background thread
+writes the queue with bulk_create whenever ACTIVITY_FLUSH_BATCH events are
+waiting or every ACTIVITY_FLUSH_INTERVAL seconds, and once more at interpreter
+exit. When the queue is full new events are dropped and counted rather than
+blocking the request. created_at is therefore the flush time, at most one
+flush interval after the event. User-Agent strings are also resolved to their
+UserAgent rows at flush time, in one query per batch, so logging an event never
+touches the database.
+
+Set ACTIVITY_LOG_BUFFERED = False (e.g. in tests) to write each event directly.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .models import UserActivity, UserAgent
+
+logger = logging.getLogger(__name__)
+
+AGENT_CACHE_SIZE = 1024
+
+
+class ActivityBuffer:
+    def __init__(self, max_size, batch_size, flush_interval):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.logged = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+    def add(self, activity: UserActivity) -> bool:
+        """Queue one unsaved UserActivity; returns False if it was dropped"""
+        with self._lock:
+            if len(self._queue) >= self.max_size:
+                self.dropped += 1
+                return False
+            self._queue.append(activity)
+            self.logged += 1
+            pending = len(self._queue)
+        self._ensure_worker()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def flush(self) -> int:
+        """Write everything queued so far; safe to call from any thread"""
+        written = 0
+        while True:
+            with self._lock:
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            if not batch:
+                return written
+            try:
+                attach_user_agents(batch)
+                UserActivity.objects.bulk_create(batch, batch_size=self.batch_size)
+            except Exception:
+                self.failed += len(batch)
+                logger.exception("Failed to write %d user activities", len(batch))
+                return written
+            written += len(batch)
+            self.written += len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._queue),
+            "logged": self.logged,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def _ensure_worker(self):
+        # (re)start after fork: threads do not survive into worker processes
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="activity-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            self.flush()
+
+
+_buffer = ActivityBuffer(
+    max_size=settings.ACTIVITY_BUFFER_SIZE,
+    batch_size=settings.ACTIVITY_FLUSH_BATCH,
+    flush_interval=settings.ACTIVITY_FLUSH_INTERVAL,
+)
+atexit.register(_buffer.flush)
+
+
+_agent_ids = {}  # User-Agent string -> UserAgent id, per process
+
+
+def user_agent_ids(values) -> dict:
+    """{value: UserAgent id} for the given strings, creating the missing rows in bulk"""
+    ids = {value: _agent_ids[value] for value in values if value in _agent_ids}
+    missing = {UserAgent.digest_for(value): value for value in set(values) - ids.keys()}
+    if missing:
+        found = dict(UserAgent.objects.filter(digest__in=missing).values_list('digest', 'id'))
+        new = [UserAgent(digest=digest, value=value) for digest, value in missing.items() if digest not in found]
+        if new:
+            # rows created concurrently by another process are skipped, then read back
+            UserAgent.objects.bulk_create(new, ignore_conflicts=True)
+            found.update(UserAgent.objects.filter(digest__in=[a.digest for a in new]).values_list('digest', 'id'))
+        if len(_agent_ids) + len(missing) > AGENT_CACHE_SIZE:
+            _agent_ids.clear()
+        for digest, value in missing.items():
+            ids[value] = _agent_ids[value] = found[digest]
+    return ids
+
+
+def attach_user_agents(activities):
+    """Set agent_id on activities from the User-Agent string log_activity() kept on them"""
+    values = {a._user_agent for a in activities if getattr(a, '_user_agent', '')}
+    if not values:
+        return
+    ids = user_agent_ids(values)
+    for activity in activities:
+        if getattr(activity, '_user_agent', ''):
+            activity.agent_id = ids[activity._user_agent]
+
+
+def log_activity(user, action_type, description='', *, metadata=None, request=None,
+                 ip_address=None, user_agent=''):
+    """
+    Record a UserActivity for ``user``. Pass ``request`` to capture the client
+    IP and user agent. Returns the (possibly not yet saved) activity, or None
+    if the buffer was full and the event was dropped.
+    """
+    if request is not None:
+        ip_address = ip_address or request.META.get('REMOTE_ADDR')
+        user_agent = user_agent or request.META.get('HTTP_USER_AGENT', '')
+    user_agent = (user_agent or '')[:500]
+    activity = UserActivity(
+        user=user,
+        created_by=user,
+        action_type=action_type,
+        description=(description or '')[:500],
+        metadata=metadata or {},
+        ip_address=ip_address,
+    )
+    activity._user_agent = user_agent  # resolved to agent_id when written
+    if not settings.ACTIVITY_LOG_BUFFERED:
+        attach_user_agents([activity])
+        activity.save()
+        return activity
+    return activity if _buffer.add(activity) else None
+
+
+def flush_activities() -> int:
+    return _buffer.flush()
+
+
+def activity_stats() -> dict:
+    return _buffer.stats()
@@ -0,0 +1,142 @@
+# dashboard/analytics.py
+"""
+Staff dashboard statistics: chart series computed with one GROUP BY query each,
+and headline counts computed with one conditional-aggregate query per table.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.models import Status
+from memberships.models import Membership, MembershipPayment
+
+User = get_user_model()
+
+MEMBERSHIP_STATUS_CODES = ['10', '11', '12', '13', '14', '15', '16']
+ADMIN_STATS_CACHE_KEY = 'dashboard:admin_stats'
+
+
+def clamp_days(value, default=30):
+    """Parse the ?days= parameter, bounded to 1..DASHBOARD_ANALYTICS_MAX_DAYS. Raises ValueError."""
+    days = int(value) if value not in (None, '') else default
+    return max(1, min(days, settings.DASHBOARD_ANALYTICS_MAX_DAYS))
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def daily_counts(queryset, start_date, days, field='created_at'):
+    """
+    Count rows per local day over [start_date, start_date + days) in a single query,
+    zero-filling days without rows.
+    """
+    end_date = start_date + timedelta(days=days)
+    rows = (
+        queryset
+        .filter(**{f'{field}__gte': day_start(start_date), f'{field}__lt': day_start(end_date)})
+        .annotate(day=TruncDate(field))
+        .values('day')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    counts = {row['day']: row['count'] for row in rows}
+    series = []
+    for i in range(days):
+        date = start_date + timedelta(days=i)
+        series.append({'date': date.strftime('%Y-%m-%d'), 'count': counts.get(date, 0)})
+    return series
+
+
+def status_distribution():
+    """Membership count per workflow status, counted in one conditional-aggregate query"""
+    statuses = list(
+        Status.objects.filter(status_code__in=MEMBERSHIP_STATUS_CODES).values_list('status_code', 'external_status')
+    )
+    if not statuses:
+        return []
+    counts = Membership.objects.aggregate(**{
+        f'status_{code}': Count('id', filter=Q(workflow_status__status_code=code)) for code, _ in statuses
+    })
+    return [{'status': label, 'count': counts[f'status_{code}']} for code, label in statuses]
+
+
+def build_analytics(days):
+    end_date = timezone.localdate()
+    start_date = end_date - timedelta(days=days)
+    if settings.DASHBOARD_ANALYTICS_USE_ROLLUPS:
+        from .rollups import metric_series
+        return {
+            'daily_registrations': metric_series('registrations', start_date, days),
+            'daily_applications': metric_series('applications', start_date, days),
+            'status_distribution': status_distribution(),
+        }
+    return {
+        'daily_registrations': daily_counts(User.objects.filter(is_active=True), start_date, days),
+        'daily_applications': daily_counts(Membership.objects.all(), start_date, days),
+        'status_distribution': status_distribution(),
+    }
+
+
+def get_analytics(days):
+    """Analytics payload for the last ``days`` days, cached per (range, day)"""
+    key = f'dashboard:analytics:{days}:{timezone.localdate().isoformat()}'
+    data = cache.get(key)
+    if data is None:
+        data = build_analytics(days)
+        cache.set(key, data, settings.DASHBOARD_ANALYTICS_CACHE_TTL)
+    return data
+
+
+def build_admin_stats():
+    today = timezone.localdate()
+    since_30d = day_start(today - timedelta(days=30))
+    since_7d = day_start(today - timedelta(days=7))
+
+    user_stats = User.objects.aggregate(
+        total_users=Count('id', filter=Q(is_active=True)),
+        verified_users=Count('id', filter=Q(is_active=True, is_verified=True)),
+        new_users_30d=Count('id', filter=Q(is_active=True, created_at__gte=since_30d)),
+        new_users_7d=Count('id', filter=Q(is_active=True, created_at__gte=since_7d)),
+    )
+    membership_stats = Membership.objects.aggregate(
+        total_applications=Count('id'),
+        # Draft, Pending Payment, Pending Approval
+        pending_approval=Count('id', filter=Q(workflow_status__status_code__in=['10', '11', '12'])),
+        approved=Count('id', filter=Q(workflow_status__status_code='13')),
+        new_applications_30d=Count('id', filter=Q(created_at__gte=since_30d)),
+    )
+    payment_stats = MembershipPayment.objects.aggregate(
+        total_payments=Count('id'),
+        paid_payments=Count('id', filter=Q(status='paid')),
+        pending_payments=Count('id', filter=Q(status__in=['created', 'pending'])),
+        total_revenue=Sum('amount', filter=Q(status='paid')),
+    )
+    payment_stats['total_revenue'] = payment_stats['total_revenue'] or 0
+
+    return {
+        'user_stats': user_stats,
+        'membership_stats': membership_stats,
+        'payment_stats': payment_stats,
+    }
+
+
+def get_admin_stats():
+    """
+    Headline user/membership/payment statistics as a short-lived snapshot.
+    Invalidated by saves and deletes of the underlying models (see dashboard.signals).
+    """
+    stats = cache.get(ADMIN_STATS_CACHE_KEY)
+    if stats is None:
+        stats = build_admin_stats()
+        cache.set(ADMIN_STATS_CACHE_KEY, stats, settings.DASHBOARD_STATS_CACHE_TTL)
+    return stats
+
+
+def invalidate_admin_stats():
+    cache.delete(ADMIN_STATS_CACHE_KEY)
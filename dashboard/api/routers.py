@@ -0,0 +1,16 @@
+# dashboard/api/routers.py
+from django.urls import path
+
+from .views import (
+    AdminDashboardAPIView,
+    DashboardAnalyticsAPIView,
+    LogActivityAPIView,
+    PublicDashboardAPIView,
+)
+
+urlpatterns = [
+    path("public/", PublicDashboardAPIView.as_view(), name="api-dashboard-public"),
+    path("admin/", AdminDashboardAPIView.as_view(), name="api-dashboard-admin"),
+    path("analytics/", DashboardAnalyticsAPIView.as_view(), name="api-dashboard-analytics"),
+    path("log-activity/", LogActivityAPIView.as_view(), name="api-dashboard-log-activity"),
+]
@@ -4,7 +4,7 @@ from django.db.models import Count
 from django.utils import timezone
 from datetime import timedelta
 
-from dashboards.models import DashboardWidget, UserActivity, Notification
+from dashboard.models import DashboardWidget, UserActivity, Notification
 from memberships.models import Membership, MembershipPayment
 from memberships.api.serializers import MembershipReadSerializer
 
@@ -43,8 +43,11 @@ class PublicDashboardSerializer(serializers.Serializer):
     membership_stats = serializers.SerializerMethodField()
     payment_info = serializers.SerializerMethodField()
     recent_activities = UserActivitySerializer(many=True, read_only=True)
+    activities_cursor = serializers.CharField(allow_null=True, read_only=True)
     unread_notifications = NotificationSerializer(many=True, read_only=True)
-    widgets = DashboardWidgetSerializer(many=True, read_only=True)
+    unread_count = serializers.IntegerField(read_only=True)
+    widgets = serializers.ListField(child=serializers.DictField(), read_only=True,
+                                    help_text="Evaluated widgets, see dashboard.widgets")
 
     def get_user(self, obj):
         from users.api.serializers import UserPrivateSerializer
@@ -90,7 +93,7 @@ class PaymentStatsSerializer(serializers.Serializer):
 class QuickActionSerializer(serializers.Serializer):
     """Quick action items"""
     title = serializers.CharField()
-    url = serializers.URLField()
+    url = serializers.CharField()
     icon = serializers.CharField()
     description = serializers.CharField()
 
@@ -102,8 +105,10 @@ class AdminDashboardSerializer(serializers.Serializer):
     membership_stats = MembershipStatsSerializer()
     payment_stats = PaymentStatsSerializer()
     recent_activities = UserActivitySerializer(many=True, read_only=True)
+    activities_cursor = serializers.CharField(allow_null=True, read_only=True)
     pending_memberships = MembershipReadSerializer(many=True, read_only=True)
-    widgets = DashboardWidgetSerializer(many=True, read_only=True)
+    widgets = serializers.ListField(child=serializers.DictField(), read_only=True,
+                                    help_text="Evaluated widgets, see dashboard.widgets")
     quick_actions = QuickActionSerializer(many=True, read_only=True)
 
     def get_user(self, obj):
@@ -128,15 +133,4 @@ class LogActivitySerializer(serializers.Serializer):
     """Log user activity"""
     action_type = serializers.ChoiceField(choices=UserActivity.ACTION_TYPES)
     description = serializers.CharField(max_length=500)
-    metadata = serializers.JSONField(required=False, default=dict)
-
-    def create(self, validated_data):
-        request = self.context['request']
-        return UserActivity.objects.create(
-            user=request.user,
-            action_type=validated_data['action_type'],
-            description=validated_data['description'],
-            metadata=validated_data.get('metadata', {}),
-            ip_address=request.META.get('REMOTE_ADDR'),
-            user_agent=request.META.get('HTTP_USER_AGENT', '')[:500],
-        )
\ No newline at end of file
+    metadata = serializers.JSONField(required=False, default=dict)
\ No newline at end of file
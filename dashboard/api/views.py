@@ -0,0 +1,172 @@
+# dashboard/api/views.py
+"""
+Single-payload dashboard endpoints for the SPA and mobile clients.
+
+Each endpoint assembles the whole dashboard with a fixed number of queries
+(independent of the data volume) and answers with an ETag computed from the
+payload, so a client revalidating with If-None-Match gets a bodiless 304
+when nothing changed.
+"""
+import hashlib
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.views import APIView
+
+from core.responses import ok, fail
+from dashboard.activity import log_activity
+from dashboard.analytics import clamp_days, get_admin_stats, get_analytics
+from dashboard.feeds import keyset_page
+from dashboard.models import Notification, UserActivity
+from dashboard.notifications import unread_count
+from dashboard.views import ADMIN_QUICK_ACTIONS
+from dashboard.widgets import evaluate_widgets, visible_widgets
+from memberships.models import Membership, MembershipPayment
+from .serializers import (
+    AdminDashboardSerializer,
+    AnalyticsDataSerializer,
+    LogActivitySerializer,
+    PublicDashboardSerializer,
+)
+
+User = get_user_model()
+
+MEMBERSHIP_READ_RELATED = (
+    "user", "membership_type", "profile_info", "contact_info", "work_info",
+    "education_info__education", "education_info__institution", "workflow_status",
+)
+
+
+def _user_with_roles(user):
+    return (
+        User.objects
+        .select_related("profile")
+        .prefetch_related("roles")
+        .get(pk=user.pk)
+    )
+
+
+def etag_response(request, data, message="OK"):
+    """Enveloped 200 with a strong ETag over ``data``, or 304 if the client already has it"""
+    digest = hashlib.sha256(json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True).encode()).hexdigest()
+    etag = f'"{digest[:32]}"'
+    if etag in [tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")]:
+        response = HttpResponseNotModified()
+    else:
+        response = ok(data, message)
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class PublicDashboardAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(responses=PublicDashboardSerializer)
+    def get(self, request):
+        user = _user_with_roles(request.user)
+        membership = (
+            Membership.objects.select_related(*MEMBERSHIP_READ_RELATED).filter(user=user).first()
+        )
+        latest_payment = None
+        if membership is not None:
+            latest_payment = (
+                MembershipPayment.objects.filter(membership=membership).order_by("-created_at").first()
+            )
+        recent_activities, activities_cursor = keyset_page(
+            UserActivity.objects.select_related("user").filter(user=user), limit=10
+        )
+        unread_notifications = list(
+            Notification.objects.filter(user=user, is_read=False).order_by("-created_at")[:5]
+        )
+
+        payload = {
+            "user": user,
+            "membership": membership,
+            "membership_stats": {
+                "has_membership": membership is not None,
+                "status": (membership.workflow_status.external_status
+                           if membership and membership.workflow_status else "No Application"),
+                "reference_no": membership.reference_no if membership else None,
+                "applied_date": membership.applied_date if membership else None,
+                "can_edit": membership.can_edit() if membership else False,
+            },
+            "payment_info": {
+                "uuid": str(latest_payment.uuid),
+                "status": latest_payment.status,
+                "amount": latest_payment.amount,
+                "currency": latest_payment.currency,
+                "method": latest_payment.method,
+                "created_at": latest_payment.created_at,
+            } if latest_payment else None,
+            "recent_activities": recent_activities,
+            "activities_cursor": activities_cursor,
+            "unread_notifications": unread_notifications,
+            "unread_count": unread_count(user.pk),
+            "widgets": evaluate_widgets(visible_widgets(user), user),
+        }
+        data = PublicDashboardSerializer(payload, context={"request": request}).data
+        return etag_response(request, data)
+
+
+class AdminDashboardAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses=AdminDashboardSerializer)
+    def get(self, request):
+        user = _user_with_roles(request.user)
+        stats = get_admin_stats()
+        recent_activities, activities_cursor = keyset_page(
+            UserActivity.objects.select_related("user"), limit=15
+        )
+        pending_memberships = list(
+            Membership.objects
+            .select_related(*MEMBERSHIP_READ_RELATED)
+            .filter(workflow_status__status_code__in=["11", "12"])  # Pending Payment, Pending Approval
+            .order_by("-created_at")[:10]
+        )
+
+        payload = {
+            "user": user,
+            "user_stats": stats["user_stats"],
+            "membership_stats": stats["membership_stats"],
+            "payment_stats": stats["payment_stats"],
+            "recent_activities": recent_activities,
+            "activities_cursor": activities_cursor,
+            "pending_memberships": pending_memberships,
+            "widgets": evaluate_widgets(visible_widgets(user), user),
+            "quick_actions": ADMIN_QUICK_ACTIONS,
+        }
+        data = AdminDashboardSerializer(payload, context={"request": request}).data
+        return etag_response(request, data)
+
+
+class DashboardAnalyticsAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses=AnalyticsDataSerializer)
+    def get(self, request):
+        try:
+            days = clamp_days(request.query_params.get("days"))
+        except ValueError:
+            return fail("days must be an integer.", status=400)
+        return etag_response(request, get_analytics(days))
+
+
+class LogActivityAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(request=LogActivitySerializer)
+    def post(self, request):
+        serializer = LogActivitySerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        # not serializer.save(): log_activity returns None when the buffer is full
+        data = serializer.validated_data
+        activity = log_activity(request.user, data["action_type"], data["description"],
+                                metadata=data["metadata"], request=request)
+        return ok({"queued": activity is not None}, "Activity logged", status=202)
@@ -0,0 +1,9 @@
+from .notifications import unread_count
+
+
+def notifications(request):
+    """Unread notification badge for the navbar (a single cache lookup)"""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'unread_notifications_count': unread_count(user.pk)}
@@ -0,0 +1,52 @@
+# dashboard/feeds.py
+"""
+Keyset ("cursor") pagination for the dashboard feeds.
+
+Pages are ordered by (-created_at, -id) and continue strictly after the last
+row of the previous page, so with the matching composite indexes every page
+is a bounded index range scan regardless of how deep the client scrolls.
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at, pk):
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """(created_at, id) from a cursor string. Raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+def page_size(value, default=DEFAULT_PAGE_SIZE):
+    """Parse ?limit=, bounded to 1..MAX_PAGE_SIZE. Raises ValueError."""
+    size = int(value) if value not in (None, "") else default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def keyset_page(queryset, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One page of ``queryset`` newest first, starting after ``cursor``.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    queryset = queryset.filter(created_at__isnull=False).order_by("-created_at", "-id")
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    rows = list(queryset[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].pk)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.services.retention import archive_activities
+
+
+class Command(BaseCommand):
+    help = "Archive user activities older than the retention period to gzip'd NDJSON and delete them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Retention in days (default: ACTIVITY_RETENTION_DAYS)")
+        parser.add_argument("--output-dir", help="Archive directory (default: ACTIVITY_ARCHIVE_DIR)")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows written and deleted per batch")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the rows to archive")
+
+    def handle(self, *args, **opts):
+        result = archive_activities(
+            days=opts["days"],
+            output_dir=opts["output_dir"],
+            chunk_size=opts["chunk_size"],
+            dry_run=opts["dry_run"],
+        )
+        prefix = "[dry run] " if opts["dry_run"] else ""
+        target = f" to {result['file']}" if result["file"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{result['archived']} activities archived{target} in {result['elapsed']}s"
+        ))
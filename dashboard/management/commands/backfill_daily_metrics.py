@@ -0,0 +1,54 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from dashboard.rollups import rebuild_range
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the DailyMetric rollups for a date range, a few days at a time "
+            "(schedule with --days 7 nightly to reconcile drift)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=_parse_date, help="First day (default: first user registration)")
+        parser.add_argument("--end", type=_parse_date, help="Last day, inclusive (default: today)")
+        parser.add_argument("--days", type=int, help="Only the last N days up to --end (overrides --start)")
+        parser.add_argument("--chunk-days", type=int, default=31, help="Days rebuilt per transaction")
+
+    def handle(self, *args, **opts):
+        end = (opts["end"] or timezone.localdate()) + timedelta(days=1)
+        start = opts["start"]
+        if opts["days"] is not None:
+            if opts["days"] < 1:
+                raise CommandError("--days must be at least 1")
+            start = end - timedelta(days=opts["days"])
+        if start is None:
+            first = get_user_model().objects.aggregate(first=Min("created_at"))["first"]
+            start = timezone.localdate(first) if first else end - timedelta(days=1)
+        if start >= end:
+            raise CommandError("--start must not be after --end")
+        chunk = timedelta(days=max(1, opts["chunk_days"]))
+
+        started = time.monotonic()
+        rows = 0
+        day = start
+        while day < end:
+            upper = min(day + chunk, end)
+            rows += rebuild_range(day, upper)
+            day = upper
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {rows} rollup rows for {start}..{end - timedelta(days=1)} "
+            f"in {time.monotonic() - started:.2f}s"
+        ))
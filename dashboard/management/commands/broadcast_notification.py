@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.models import NotificationBroadcast
+from dashboard.services.fanout import create_broadcast, run_broadcast
+
+
+class Command(BaseCommand):
+    help = "Send a dashboard notification to an audience, or run queued broadcasts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--title", help="Notification title (creates a new broadcast)")
+        parser.add_argument("--message", default="")
+        parser.add_argument("--type", dest="notification_type", default="info",
+                            choices=[code for code, _ in NotificationBroadcast._meta.get_field(
+                                "notification_type").choices])
+        parser.add_argument("--action-url", default="")
+        parser.add_argument("--action-text", default="")
+        parser.add_argument("--audience", choices=["all", "members", "staff"], default="members")
+        parser.add_argument("--status", nargs="*", default=[],
+                            help="Membership workflow status codes to target (members audience only)")
+        parser.add_argument("--queue", action="store_true", help="Only queue the broadcast")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Notifications inserted per statement")
+        parser.add_argument("--loop", type=int, default=0,
+                            help="Without --title: keep polling for queued broadcasts every N seconds")
+
+    def handle(self, *args, **opts):
+        if opts["status"] and opts["audience"] != "members":
+            raise CommandError("--status can only be used with --audience members")
+
+        if opts["title"]:
+            broadcast = create_broadcast(
+                opts["title"],
+                opts["message"],
+                audience=opts["audience"],
+                status_codes=opts["status"],
+                notification_type=opts["notification_type"],
+                action_url=opts["action_url"],
+                action_text=opts["action_text"],
+            )
+            if opts["queue"]:
+                self.stdout.write(self.style.SUCCESS(f"Queued broadcast {broadcast.pk}"))
+                return
+            self._run(broadcast, opts["chunk_size"])
+            return
+
+        while True:
+            for broadcast in NotificationBroadcast.objects.filter(status="queued").order_by("id"):
+                self._run(broadcast, opts["chunk_size"])
+            if not opts["loop"]:
+                break
+            time.sleep(opts["loop"])
+
+    def _run(self, broadcast, chunk_size):
+        result = run_broadcast(broadcast, chunk_size=chunk_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"Broadcast {result['broadcast']}: {result['sent']} notifications, "
+            f"{result['status']} in {result['elapsed']}s"
+        ))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('metric', models.CharField(choices=[('registrations', 'User Registrations'), ('applications', 'Membership Applications by Status'), ('payments', 'Payments by Method and Status'), ('revenue', 'Revenue by Currency')], max_length=30)),
+                ('dimension', models.CharField(blank=True, default='', help_text='Status code, method:status or currency depending on the metric', max_length=64)),
+                ('count', models.BigIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('metric', 'date', 'dimension'), name='dashboard_dailymetric_unique')],
+            },
+        ),
+    ]
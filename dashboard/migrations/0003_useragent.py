@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:21
+
+import hashlib
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def move_user_agents(apps, schema_editor):
+    UserActivity = apps.get_model('dashboard', 'UserActivity')
+    UserAgent = apps.get_model('dashboard', 'UserAgent')
+    values = UserActivity.objects.exclude(user_agent='').values_list('user_agent', flat=True).order_by().distinct()
+    for value in list(values):
+        agent = UserAgent.objects.create(digest=hashlib.sha256(value.encode('utf-8')).hexdigest(), value=value)
+        UserActivity.objects.filter(user_agent=value).update(agent=agent)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_dailymetric'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserAgent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(help_text='SHA-256 of value', max_length=64, unique=True)),
+                ('value', models.TextField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='useractivity',
+            name='agent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='dashboard.useragent'),
+        ),
+        migrations.RunPython(move_user_agents, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='useractivity',
+            name='user_agent',
+        ),
+    ]
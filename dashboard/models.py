@@ -1,4 +1,4 @@
-from django.db import models
+import hashlib
 
 from django.db import models
 from django.contrib.auth import get_user_model
@@ -31,6 +31,19 @@ class DashboardWidget(AuditModel):
         return f"{self.name} ({'Staff' if self.is_staff_only else 'Public'})"
 
 
+class UserAgent(models.Model):
+    """Distinct User-Agent strings, referenced by UserActivity instead of repeating the text"""
+    digest = models.CharField(max_length=64, unique=True, help_text="SHA-256 of value")
+    value = models.TextField()
+
+    def __str__(self):
+        return self.value[:80]
+
+    @staticmethod
+    def digest_for(value):
+        return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
 class UserActivity(AuditModel):
     """Track user activities for dashboard feed"""
     ACTION_TYPES = [
@@ -47,15 +60,23 @@ class UserActivity(AuditModel):
     description = models.CharField(max_length=500)
     metadata = models.JSONField(default=dict, blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    user_agent = models.TextField(blank=True)
+    agent = models.ForeignKey(UserAgent, on_delete=models.PROTECT, null=True, blank=True, related_name='+')
 
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = "User Activities"
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='dash_activity_user_feed_idx'),
+            models.Index(fields=['-created_at', '-id'], name='dash_activity_feed_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.get_action_type_display()}"
 
+    @property
+    def user_agent(self):
+        return self.agent.value if self.agent_id else ''
+
 
 class Notification(AuditModel):
     """User notifications"""
@@ -77,12 +98,85 @@ class Notification(AuditModel):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='dash_notif_user_feed_idx'),
+            models.Index(fields=['user', 'is_read', '-created_at'], name='dash_notif_user_unread_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.title}"
 
     def mark_as_read(self):
-        from django.utils import timezone
-        self.is_read = True
-        self.read_at = timezone.now()
-        self.save(update_fields=['is_read', 'read_at'])
\ No newline at end of file
+        from .notifications import mark_read
+        return mark_read(self)
+
+
+class DailyMetric(models.Model):
+    """
+    Per-day rollup of a dashboard metric, maintained incrementally from model
+    signals (dashboard.rollups) and rebuilt by `manage.py backfill_daily_metrics`.
+    """
+    METRICS = [
+        ('registrations', 'User Registrations'),
+        ('applications', 'Membership Applications by Status'),
+        ('payments', 'Payments by Method and Status'),
+        ('revenue', 'Revenue by Currency'),
+    ]
+
+    date = models.DateField()
+    metric = models.CharField(max_length=30, choices=METRICS)
+    dimension = models.CharField(max_length=64, blank=True, default='',
+                                 help_text="Status code, method:status or currency depending on the metric")
+    count = models.BigIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'date', 'dimension'], name='dashboard_dailymetric_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.metric}[{self.dimension}] = {self.count}"
+
+
+class NotificationBroadcast(AuditModel):
+    """A notification fanned out to an audience of users, with progress tracking"""
+    AUDIENCES = [
+        ('all', 'All active users'),
+        ('members', 'Members'),
+        ('staff', 'Staff'),
+    ]
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES, default='info')
+    action_url = models.URLField(blank=True)
+    action_text = models.CharField(max_length=50, blank=True)
+
+    audience = models.CharField(max_length=20, choices=AUDIENCES, default='members')
+    status_codes = models.JSONField(default=list, blank=True,
+                                    help_text="Membership workflow status codes (members audience only)")
+
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='queued', db_index=True)
+    total_recipients = models.PositiveIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.title} ({self.get_status_display()})"
+
+    @property
+    def progress(self):
+        return round(100 * self.sent_count / self.total_recipients, 1) if self.total_recipients else 0.0
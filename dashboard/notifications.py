@@ -0,0 +1,104 @@
+# dashboard/notifications.py
+"""
+Per-user unread notification counters.
+
+The count lives in the cache and is adjusted with incr/decr when notifications
+are created, read or deleted (see dashboard.signals), once the writing
+transaction commits: a rollback leaves the counter alone, and a recount that
+read the pre-commit rows is corrected or dropped afterwards. A missing key is
+simply recounted from the database, and keys expire after
+NOTIFICATION_UNREAD_RECONCILE seconds so any drift is bounded. Code that writes
+notifications in bulk (bulk_create / queryset.update) must call
+invalidate_unread() for the affected users.
+
+Every change is also published on core.pubsub (see user_channel and
+BROADCAST_CHANNEL) so open notification streams can push it to the browser.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from core import pubsub
+from .models import Notification
+
+BROADCAST_CHANNEL = 'notifications:broadcast'
+# above this many users one broadcast message replaces per-user messages
+BROADCAST_THRESHOLD = 20
+
+
+def _key(user_id):
+    return f'dashboard:unread:{user_id}'
+
+
+def user_channel(user_id):
+    return f'notifications:user:{user_id}'
+
+
+def publish_changes(*user_ids):
+    """Tell open notification streams (once committed) that these users' notifications changed"""
+    def publish():
+        if len(user_ids) > BROADCAST_THRESHOLD:
+            pubsub.publish(BROADCAST_CHANNEL, {'users': list(user_ids)})
+        else:
+            for user_id in user_ids:
+                pubsub.publish(user_channel(user_id), {'users': [user_id]})
+
+    transaction.on_commit(publish)
+
+
+def unread_count(user_id) -> int:
+    """Unread notifications of a user: one cache lookup, recounted on a miss"""
+    count = cache.get(_key(user_id))
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cache.set(_key(user_id), count, settings.NOTIFICATION_UNREAD_RECONCILE)
+    return count
+
+
+def adjust_unread(user_id, delta):
+    """
+    Add ``delta`` to a cached counter once committed; a missing key is left for
+    unread_count to recount
+    """
+    def adjust():
+        try:
+            count = cache.incr(_key(user_id), delta)
+            if count < 0:
+                cache.delete(_key(user_id))
+        except ValueError:
+            pass
+
+    transaction.on_commit(adjust)
+    publish_changes(user_id)
+
+
+def invalidate_unread(*user_ids):
+    """Drop the cached counters once committed, so they are recounted from the new rows"""
+    keys = [_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+    publish_changes(*user_ids)
+
+
+def mark_read(notification) -> bool:
+    """Mark one notification read with a conditional UPDATE; returns False if it already was"""
+    now = timezone.now()
+    updated = Notification.objects.filter(pk=notification.pk, is_read=False).update(
+        is_read=True, read_at=now, modified_at=now
+    )
+    notification.is_read, notification.read_at = True, notification.read_at or now
+    if updated:
+        adjust_unread(notification.user_id, -1)
+    return bool(updated)
+
+
+def mark_all_read(user) -> int:
+    """Mark every unread notification of ``user`` read in a single UPDATE"""
+    now = timezone.now()
+    updated = Notification.objects.filter(user=user, is_read=False).update(
+        is_read=True, read_at=now, modified_at=now
+    )
+    transaction.on_commit(lambda: cache.set(_key(user.pk), 0, settings.NOTIFICATION_UNREAD_RECONCILE))
+    if updated:
+        publish_changes(user.pk)
+    return updated
@@ -0,0 +1,197 @@
+# dashboard/rollups.py
+"""
+Daily metric rollups (DailyMetric).
+
+Rows are bumped incrementally from model signals (see dashboard.signals); bulk
+writers that bypass the signals (the renewal run) call the helpers under "bulk
+writers" instead. Notifications and reminders feed no metric. Any date range can
+be rebuilt from the transactional tables with `manage.py backfill_daily_metrics`;
+schedule `backfill_daily_metrics --days 7` nightly to reconcile whatever slipped
+past both (raw SQL, shell fixes, a crash between a write and its bump).
+
+Metrics and their dimensions:
+    registrations  active users created per day                   ''
+    applications   memberships created per day, by current status  status code
+    payments       payments created per day, by method and status   "method:status"
+    revenue        payments paid per day (count and amount)         currency
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Sum, Value
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from core.models import Status
+from memberships.models import Membership, MembershipPayment
+from .analytics import day_start
+from .models import DailyMetric
+
+User = get_user_model()
+
+_status_codes = {}
+
+
+def status_code(status_id):
+    """Status code for a Status id; codes are seed data so they are memoized per process"""
+    if status_id is None:
+        return ''
+    if status_id not in _status_codes:
+        _status_codes[status_id] = Status.objects.filter(pk=status_id).values_list('status_code', flat=True).first() or ''
+    return _status_codes[status_id]
+
+
+def local_date(value):
+    return timezone.localdate(value) if value else None
+
+
+def bump(metric, day, dimension='', count=1, amount=0):
+    """
+    Atomically add ``count``/``amount`` to one rollup row, creating it if needed.
+    Decrements stop at zero, so a row that had drifted low is not driven negative.
+    """
+    if day is None:
+        return
+    lookup = {'metric': metric, 'date': day, 'dimension': dimension}
+    changes = {
+        'count': Greatest(F('count') + count, Value(0)),
+        'amount': Greatest(F('amount') + amount, Value(0), output_field=DecimalField(max_digits=14, decimal_places=2)),
+        'updated_at': timezone.now(),
+    }
+    if DailyMetric.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            DailyMetric.objects.create(count=max(count, 0), amount=max(amount, 0), **lookup)
+    except IntegrityError:
+        # created concurrently by another writer
+        DailyMetric.objects.filter(**lookup).update(**changes)
+
+
+# --- incremental maintenance, called from dashboard.signals
+
+def user_saved(user, created):
+    # registrations count active users only, so (de)activation moves the count too
+    was_active = False if created else getattr(user, '_loaded_is_active', None)
+    if was_active is not None and was_active != user.is_active:
+        bump('registrations', local_date(user.created_at), count=1 if user.is_active else -1)
+    user._loaded_is_active = user.is_active
+
+
+def user_deleted(user):
+    if user.is_active:
+        bump('registrations', local_date(user.created_at), count=-1)
+
+
+def membership_saved(membership, created):
+    day = local_date(membership.created_at)
+    new_code = status_code(membership.workflow_status_id)
+    if created:
+        bump('applications', day, new_code)
+        return
+    prev_id = getattr(membership, '_prev_workflow_status_id', membership.workflow_status_id)
+    if prev_id != membership.workflow_status_id:
+        bump('applications', day, status_code(prev_id), count=-1)
+        bump('applications', day, new_code)
+
+
+def membership_deleted(membership):
+    bump('applications', local_date(membership.created_at), status_code(membership.workflow_status_id), count=-1)
+
+
+def payment_saved(payment, created):
+    day = local_date(payment.created_at)
+    prev = None if created else getattr(payment, '_prev_status', payment.status)
+    if created:
+        bump('payments', day, f'{payment.method}:{payment.status}')
+    elif prev != payment.status:
+        bump('payments', day, f'{payment.method}:{prev}', count=-1)
+        bump('payments', day, f'{payment.method}:{payment.status}')
+
+    if payment.status == 'paid' and prev != 'paid':
+        bump('revenue', local_date(payment.paid_at or timezone.now()), payment.currency, amount=payment.amount)
+    elif prev == 'paid' and payment.status != 'paid':
+        bump('revenue', local_date(payment.paid_at or timezone.now()), payment.currency,
+             count=-1, amount=-payment.amount)
+
+
+def payment_deleted(payment):
+    bump('payments', local_date(payment.created_at), f'{payment.method}:{payment.status}', count=-1)
+    if payment.status == 'paid':
+        bump('revenue', local_date(payment.paid_at), payment.currency, count=-1, amount=-payment.amount)
+
+
+# --- bulk writers, which bypass dashboard.signals
+
+def payments_created(payments):
+    """Count payments inserted with bulk_create (instances with created_at set)"""
+    counts = Counter((local_date(p.created_at), f'{p.method}:{p.status}') for p in payments)
+    for (day, dimension), count in counts.items():
+        bump('payments', day, dimension, count=count)
+
+
+def memberships_moved(rows, new_status_id):
+    """Move applications given as (created_at, old workflow_status_id) rows to ``new_status_id``"""
+    counts = Counter((local_date(created_at), old_id) for created_at, old_id in rows if old_id != new_status_id)
+    new_code = status_code(new_status_id)
+    for (day, old_id), count in counts.items():
+        bump('applications', day, status_code(old_id), count=-count)
+        bump('applications', day, new_code, count=count)
+
+
+# --- backfill
+
+def compute_rollups(start_date, end_date):
+    """DailyMetric rows for [start_date, end_date) computed from the transactional tables"""
+    lo, hi = day_start(start_date), day_start(end_date)
+
+    def grouped(queryset, field, *dimensions, **aggregates):
+        return (
+            queryset
+            .filter(**{f'{field}__gte': lo, f'{field}__lt': hi})
+            .annotate(day=TruncDate(field))
+            .values('day', *dimensions)
+            .annotate(n=Count('id'), **aggregates)
+            .order_by()
+        )
+
+    rows = []
+    for r in grouped(User.objects.filter(is_active=True), 'created_at'):
+        rows.append(DailyMetric(date=r['day'], metric='registrations', count=r['n']))
+    for r in grouped(Membership.objects.all(), 'created_at', 'workflow_status__status_code'):
+        rows.append(DailyMetric(date=r['day'], metric='applications',
+                                dimension=r['workflow_status__status_code'] or '', count=r['n']))
+    for r in grouped(MembershipPayment.objects.all(), 'created_at', 'method', 'status'):
+        rows.append(DailyMetric(date=r['day'], metric='payments',
+                                dimension=f"{r['method']}:{r['status']}", count=r['n']))
+    for r in grouped(MembershipPayment.objects.filter(status='paid'), 'paid_at', 'currency', total=Sum('amount')):
+        rows.append(DailyMetric(date=r['day'], metric='revenue', dimension=r['currency'],
+                                count=r['n'], amount=r['total'] or 0))
+    return rows
+
+
+def rebuild_range(start_date, end_date):
+    """Replace the rollups of [start_date, end_date) with freshly computed rows"""
+    rows = compute_rollups(start_date, end_date)
+    with transaction.atomic():
+        DailyMetric.objects.filter(date__gte=start_date, date__lt=end_date).delete()
+        DailyMetric.objects.bulk_create(rows)
+    return len(rows)
+
+
+# --- reading
+
+def metric_series(metric, start_date, days, dimensions=None):
+    """Zero-filled daily totals of ``metric`` (summed over dimensions) from the rollup table"""
+    end_date = start_date + timedelta(days=days)
+    rows = DailyMetric.objects.filter(metric=metric, date__gte=start_date, date__lt=end_date)
+    if dimensions is not None:
+        rows = rows.filter(dimension__in=dimensions)
+    totals = dict(rows.values('date').annotate(total=Sum('count')).order_by().values_list('date', 'total'))
+    series = []
+    for i in range(days):
+        date = start_date + timedelta(days=i)
+        series.append({'date': date.strftime('%Y-%m-%d'), 'count': totals.get(date, 0)})
+    return series
@@ -0,0 +1,136 @@
+# dashboard/services/fanout.py
+"""
+Notification fan-out.
+
+Recipients are streamed as user ids in keyset chunks and each chunk becomes a
+single multi-row INSERT, so notifying tens of thousands of users costs a few
+dozen statements. Larger broadcasts are tracked as NotificationBroadcast rows
+and can run in a background thread or from `manage.py broadcast_notification`.
+"""
+import logging
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.utils.batching import chunked_values
+from dashboard.models import Notification, NotificationBroadcast
+from dashboard.notifications import invalidate_unread
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+def audience_users(audience: str, status_codes=None):
+    """Active users of an audience: "all", "staff" or "members" (optionally by workflow status)"""
+    users = User.objects.filter(is_active=True)
+    if audience == "staff":
+        return users.filter(is_staff=True)
+    if audience == "members":
+        users = users.filter(membership__isnull=False)
+        if status_codes:
+            users = users.filter(membership__workflow_status__status_code__in=status_codes)
+        return users
+    if audience != "all":
+        raise ValueError(f"Unknown audience '{audience}'")
+    return users
+
+
+def notify_users(users, *, title: str, message: str, notification_type: str = "info", action_url: str = "",
+                 action_text: str = "", chunk_size: int = 1000, on_chunk=None) -> int:
+    """
+    Create one Notification per user of the ``users`` queryset, one INSERT per chunk.
+    ``on_chunk(count)`` is called after every chunk. Returns the number created.
+    """
+    created = 0
+    for rows in chunked_values(users, chunk_size=chunk_size):
+        user_ids = [pk for pk, in rows]
+        with transaction.atomic():
+            Notification.objects.bulk_create([
+                Notification(
+                    user_id=user_id,
+                    title=title,
+                    message=message,
+                    notification_type=notification_type,
+                    action_url=action_url,
+                    action_text=action_text,
+                )
+                for user_id in user_ids
+            ], batch_size=chunk_size)
+        invalidate_unread(*user_ids)
+        created += len(user_ids)
+        if on_chunk is not None:
+            on_chunk(len(user_ids))
+    return created
+
+
+def create_broadcast(title: str, message: str, *, audience: str = "members", status_codes=None,
+                     notification_type: str = "info", action_url: str = "", action_text: str = ""):
+    audience_users(audience, status_codes)  # validate the audience up front
+    return NotificationBroadcast.objects.create(
+        title=title,
+        message=message,
+        notification_type=notification_type,
+        action_url=action_url,
+        action_text=action_text,
+        audience=audience,
+        status_codes=list(status_codes or []),
+    )
+
+
+def run_broadcast(broadcast: NotificationBroadcast, *, chunk_size: int = 1000) -> dict:
+    """Fan a queued broadcast out to its audience, recording progress after every chunk."""
+    claimed = NotificationBroadcast.objects.filter(pk=broadcast.pk, status="queued").update(
+        status="running", started_at=timezone.now()
+    )
+    if not claimed:
+        broadcast.refresh_from_db()
+        return {"broadcast": broadcast.pk, "sent": 0, "status": broadcast.status, "elapsed": 0.0}
+
+    started = time.monotonic()
+    users = audience_users(broadcast.audience, broadcast.status_codes)
+    NotificationBroadcast.objects.filter(pk=broadcast.pk).update(total_recipients=users.count())
+
+    def progress(count):
+        NotificationBroadcast.objects.filter(pk=broadcast.pk).update(sent_count=F("sent_count") + count)
+
+    status, error, sent = "completed", "", 0
+    try:
+        sent = notify_users(
+            users,
+            title=broadcast.title,
+            message=broadcast.message,
+            notification_type=broadcast.notification_type,
+            action_url=broadcast.action_url,
+            action_text=broadcast.action_text,
+            chunk_size=chunk_size,
+            on_chunk=progress,
+        )
+    except Exception as exc:
+        logger.exception("Notification broadcast %s failed", broadcast.pk)
+        status, error = "failed", str(exc)
+
+    NotificationBroadcast.objects.filter(pk=broadcast.pk).update(
+        status=status, error=error, finished_at=timezone.now()
+    )
+    broadcast.refresh_from_db()
+    return {"broadcast": broadcast.pk, "sent": sent, "status": status,
+            "elapsed": round(time.monotonic() - started, 3)}
+
+
+def start_broadcast(broadcast: NotificationBroadcast, *, chunk_size: int = 1000) -> threading.Thread:
+    """Run a broadcast in a background thread; poll the row for progress"""
+    def target():
+        try:
+            run_broadcast(broadcast, chunk_size=chunk_size)
+        finally:
+            close_old_connections()
+
+    thread = threading.Thread(target=target, name=f"broadcast-{broadcast.pk}", daemon=True)
+    # start only once the broadcast row is visible to the thread's own connection
+    transaction.on_commit(thread.start)
+    return thread
@@ -0,0 +1,87 @@
+# dashboard/services/retention.py
+"""
+UserActivity retention.
+
+Rows older than the retention period are streamed in keyset chunks into a
+gzip'd NDJSON file (one JSON object per line), so the live table only holds the
+recent feed. The file is written under a temporary name, closed, fsynced and
+renamed into place before any row is deleted: a crash leaves either no archive
+and every row, or a complete archive. Rows are then deleted in chunks; if that
+is interrupted, the next run archives the remainder again (duplicates share
+their uuid).
+"""
+import gzip
+import json
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from core.utils.batching import chunked_values
+from dashboard.models import UserActivity
+
+ARCHIVE_FIELDS = (
+    "uuid", "user_id", "action_type", "description", "metadata",
+    "ip_address", "agent__value", "created_at", "created_by_id",
+)
+
+
+def expired_activities(days: int, now=None):
+    now = now or timezone.now()
+    return UserActivity.objects.filter(created_at__lt=now - timedelta(days=days))
+
+
+def archive_activities(*, days: int | None = None, output_dir=None, chunk_size: int = 5000,
+                       dry_run: bool = False) -> dict:
+    """Move activities older than ``days`` into one compressed NDJSON file and delete them."""
+    days = settings.ACTIVITY_RETENTION_DAYS if days is None else days
+    output_dir = output_dir or settings.ACTIVITY_ARCHIVE_DIR
+    started = time.monotonic()
+    now = timezone.now()
+    queryset = expired_activities(days, now=now)
+
+    if dry_run:
+        return {"archived": queryset.count(), "file": None, "elapsed": round(time.monotonic() - started, 3)}
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"user_activity_{now:%Y%m%dT%H%M%S}.ndjson.gz")
+    partial = path + ".partial"
+    archived, last_id = 0, None
+    with gzip.open(partial, "wt", encoding="utf-8") as fh:
+        for rows in chunked_values(queryset, *ARCHIVE_FIELDS, chunk_size=chunk_size):
+            for row in rows:
+                record = dict(zip(("id",) + ARCHIVE_FIELDS, row))
+                record["user_agent"] = record.pop("agent__value") or ""
+                fh.write(json.dumps(record, cls=DjangoJSONEncoder))
+                fh.write("\n")
+            archived += len(rows)
+            last_id = rows[-1][0]
+
+    if not archived:
+        os.remove(partial)
+        return {"archived": 0, "file": None, "elapsed": round(time.monotonic() - started, 3)}
+
+    _fsync(partial)
+    os.replace(partial, path)
+    _fsync(output_dir)
+
+    # exactly the archived rows: new activities are never older than the cutoff
+    for rows in chunked_values(queryset.filter(pk__lte=last_id), chunk_size=chunk_size):
+        with transaction.atomic():
+            UserActivity.objects.filter(pk__in=[pk for pk, in rows]).delete()
+    return {"archived": archived, "file": path, "elapsed": round(time.monotonic() - started, 3)}
+
+
+def _fsync(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # directories cannot be opened on some platforms
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from memberships.models import Membership, MembershipPayment
+from . import rollups
+from .models import Notification
+from .notifications import adjust_unread
+from .analytics import invalidate_admin_stats
+
+User = get_user_model()
+
+
+# User fields the admin stats snapshot counts by
+USER_STAT_FIELDS = {'is_active', 'is_verified', 'created_at'}
+
+
+@receiver([post_save, post_delete], sender=User)
+def _invalidate_user_stats(sender, created=False, update_fields=None, **kwargs):
+    # logins save only last_login; leave the snapshot alone for such partial saves
+    if created or update_fields is None or USER_STAT_FIELDS & set(update_fields):
+        invalidate_admin_stats()
+
+
+@receiver([post_save, post_delete], sender=Membership)
+@receiver([post_save, post_delete], sender=MembershipPayment)
+def _invalidate_admin_stats(sender, **kwargs):
+    invalidate_admin_stats()
+
+
+# Daily rollups. Queryset updates and bulk_create bypass these receivers; bulk
+# writers apply their changes through the helpers in dashboard.rollups, and the
+# nightly `backfill_daily_metrics --days 7` reconciles anything else.
+
+@receiver(post_init, sender=User)
+def _remember_is_active(sender, instance, **kwargs):
+    # lets _rollup_user_saved see activation changes without a query (None if deferred)
+    instance._loaded_is_active = instance.__dict__.get('is_active')
+
+
+@receiver(post_save, sender=User)
+def _rollup_user_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        rollups.user_saved(instance, created)
+
+
+@receiver(post_delete, sender=User)
+def _rollup_user_deleted(sender, instance, **kwargs):
+    rollups.user_deleted(instance)
+
+
+@receiver(post_save, sender=Membership)
+def _rollup_membership_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        rollups.membership_saved(instance, created)
+
+
+@receiver(post_delete, sender=Membership)
+def _rollup_membership_deleted(sender, instance, **kwargs):
+    rollups.membership_deleted(instance)
+
+
+@receiver(post_save, sender=MembershipPayment)
+def _rollup_payment_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        rollups.payment_saved(instance, created)
+
+
+@receiver(post_delete, sender=MembershipPayment)
+def _rollup_payment_deleted(sender, instance, **kwargs):
+    rollups.payment_deleted(instance)
+
+
+@receiver(post_save, sender=Notification)
+def _count_new_notification(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not instance.is_read:
+        adjust_unread(instance.user_id, 1)
+
+
+@receiver(post_delete, sender=Notification)
+def _uncount_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread(instance.user_id, -1)
@@ -0,0 +1,139 @@
+# dashboard/streams.py
+"""
+Server-Sent Events stream of the current user's notifications.
+
+An async view: serve the project through BMR.asgi (uvicorn, see settings) so
+each open stream costs a coroutine instead of a worker thread. Under WSGI
+(runserver, a sync gunicorn) a stream would hold a worker thread for as long
+as the tab stays open, so the view answers 503 there and points the client at
+the notification feed to poll instead. The stream
+waits on core.pubsub for changes to the user's notifications, then sends the
+new notifications and the unread count; a comment line goes out every
+SSE_HEARTBEAT seconds to keep proxies from closing idle connections.
+
+At most SSE_MAX_CONNECTIONS streams are open per process: a slot is taken
+when the stream is admitted and given back when the stream ends or the
+response is closed, whichever comes first.
+"""
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+
+from core import pubsub
+from .models import Notification
+from .notifications import BROADCAST_CHANNEL, unread_count, user_channel
+
+_open_streams = 0
+_streams_lock = threading.Lock()  # response.close() runs in a worker thread
+
+
+class _StreamSlot:
+    """One of the SSE_MAX_CONNECTIONS stream slots; release() is idempotent"""
+
+    def __init__(self):
+        self._held = False
+
+    def acquire(self):
+        global _open_streams
+        with _streams_lock:
+            if _open_streams >= settings.SSE_MAX_CONNECTIONS:
+                return False
+            _open_streams += 1
+            self._held = True
+            return True
+
+    def release(self):
+        global _open_streams
+        with _streams_lock:
+            if self._held:
+                self._held = False
+                _open_streams -= 1
+
+
+class _EventStreamResponse(StreamingHttpResponse):
+    def __init__(self, streaming_content, slot):
+        super().__init__(streaming_content, content_type='text/event-stream')
+        self._slot = slot
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            # also covers a stream whose generator never started
+            self._slot.release()
+
+
+def _event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _new_notifications(user_id, after_id):
+    queryset = Notification.objects.filter(user_id=user_id, id__gt=after_id).order_by('id')[:50]
+    return [
+        {
+            'id': n.id,
+            'title': n.title,
+            'message': n.message,
+            'notification_type': n.notification_type,
+            'action_url': n.action_url,
+            'action_text': n.action_text,
+            'created_at': n.created_at.isoformat() if n.created_at else None,
+        }
+        async for n in queryset
+    ]
+
+
+async def _unread_count(user_id):
+    return await sync_to_async(unread_count)(user_id)
+
+
+async def notification_stream(request):
+    """GET dashboard/api/notifications/stream/ (text/event-stream)"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    if not pubsub.under_asgi(request):
+        return JsonResponse({
+            'error': 'Notification streaming needs the ASGI server; poll the feed instead',
+            'poll_url': reverse('dashboard_notification_feed'),
+        }, status=503)
+
+    user_id = user.pk
+    own_channel = user_channel(user_id)
+    slot = _StreamSlot()
+
+    async def events():
+        try:
+            channels = {
+                own_channel: await pubsub.acurrent_seq(own_channel),
+                BROADCAST_CHANNEL: await pubsub.acurrent_seq(BROADCAST_CHANNEL),
+            }
+            last = await Notification.objects.filter(user_id=user_id).order_by('-id').values_list('id', flat=True).afirst()
+            last_id = last or 0
+            yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+            yield _event('unread', {'count': await _unread_count(user_id)})
+
+            while True:
+                channels, messages = await pubsub.listen(channels, timeout=settings.SSE_HEARTBEAT)
+                if not any(user_id in message.get('users', ()) for _, message in messages):
+                    yield ": heartbeat\n\n"
+                    continue
+                for notification in await _new_notifications(user_id, last_id):
+                    last_id = notification['id']
+                    yield _event('notification', notification)
+                yield _event('unread', {'count': await _unread_count(user_id)})
+        finally:
+            slot.release()
+
+    if not slot.acquire():
+        response = HttpResponse('Too many open streams', status=503, content_type='text/plain')
+        response['Retry-After'] = str(settings.SSE_HEARTBEAT)
+        return response
+    response = _EventStreamResponse(events(), slot)
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # disable nginx response buffering
+    return response
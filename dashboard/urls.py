@@ -1,5 +1,5 @@
-from django.urls import path, include
-from . import views
+from django.urls import path
+from . import streams, views
 
 urlpatterns = [
     # Main dashboard router
@@ -11,9 +11,13 @@ urlpatterns = [
 
     # AJAX endpoints
     path('api/analytics/', views.dashboard_analytics_api, name='dashboard_analytics_api'),
+    path('api/widgets/', views.dashboard_widgets_api, name='dashboard_widgets_api'),
+    path('api/activities/', views.activity_feed_api, name='dashboard_activity_feed'),
+    path('api/notifications/', views.notification_feed_api, name='dashboard_notification_feed'),
+    path('api/notifications/stream/', streams.notification_stream, name='dashboard_notification_stream'),
+    path('api/notifications/read-all/', views.mark_all_notifications_read, name='mark_all_notifications_read'),
     path('api/notifications/<int:notification_id>/read/', views.mark_notification_read, name='mark_notification_read'),
     path('api/log-activity/', views.log_user_activity, name='log_user_activity'),
 
-    # API routes for mobile/SPA
-    # path('api/', include('dashboards.api.routers')),
+    # REST API for mobile/SPA clients (JWT) lives under /api/v1/dashboard/ (dashboard.api.routers)
 ]
\ No newline at end of file
@@ -1,18 +1,48 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Q
-from django.utils import timezone
-from datetime import timedelta
 from django.http import JsonResponse
 from django.contrib.admin.views.decorators import staff_member_required
 
 from memberships.models import Membership, MembershipPayment
 from .models import DashboardWidget, UserActivity, Notification
-from core.models import Status
+from .activity import log_activity
+from .analytics import clamp_days, get_analytics, get_admin_stats
+from .feeds import keyset_page, page_size
+from .notifications import mark_all_read
+from .widgets import evaluate_widgets, visible_widgets
 
 User = get_user_model()
 
+# Quick actions of the staff dashboard
+ADMIN_QUICK_ACTIONS = [
+    {
+        'title': 'User Management',
+        'url': '/admin/auth/user/',
+        'icon': 'fas fa-users',
+        'description': 'Manage user accounts'
+    },
+    {
+        'title': 'Membership Applications',
+        'url': '/admin/memberships/membership/',
+        'icon': 'fas fa-id-card',
+        'description': 'Review applications'
+    },
+    {
+        'title': 'Payment Management',
+        'url': '/admin/memberships/membershippayment/',
+        'icon': 'fas fa-credit-card',
+        'description': 'Manage payments'
+    },
+    {
+        'title': 'Generate Reports',
+        'url': '#',
+        'icon': 'fas fa-chart-bar',
+        'description': 'View analytics'
+    },
+]
+
+
 
 @login_required
 def dashboard_router(request):
@@ -37,9 +67,7 @@ def public_dashboard(request):
         membership = None
 
     # Get recent activities
-    recent_activities = UserActivity.objects.filter(
-        user=user
-    ).order_by('-created_at')[:10]
+    recent_activities, activities_cursor = keyset_page(UserActivity.objects.filter(user=user), limit=10)
 
     # Get unread notifications
     unread_notifications = Notification.objects.filter(
@@ -84,6 +112,7 @@ def public_dashboard(request):
         'membership_stats': membership_stats,
         'payment_info': payment_info,
         'recent_activities': recent_activities,
+        'activities_cursor': activities_cursor,
         'unread_notifications': unread_notifications,
         'widgets': widgets,
         'page_title': 'Dashboard',
@@ -96,51 +125,14 @@ def admin_dashboard(request):
     """Admin/Staff dashboard with management features"""
     user = request.user
 
-    # Date ranges for analytics
-    today = timezone.now().date()
-    last_30_days = today - timedelta(days=30)
-    last_7_days = today - timedelta(days=7)
-
-    # User statistics
-    user_stats = {
-        'total_users': User.objects.filter(is_active=True).count(),
-        'verified_users': User.objects.filter(is_active=True, is_verified=True).count(),
-        'new_users_30d': User.objects.filter(
-            is_active=True,
-            created_at__date__gte=last_30_days
-        ).count(),
-        'new_users_7d': User.objects.filter(
-            is_active=True,
-            created_at__date__gte=last_7_days
-        ).count(),
-    }
-
-    # Membership statistics
-    membership_stats = {
-        'total_applications': Membership.objects.count(),
-        'pending_approval': Membership.objects.filter(
-            workflow_status__status_code__in=['10', '11', '12']  # Draft, Pending Payment, Pending Approval
-        ).count(),
-        'approved': Membership.objects.filter(
-            workflow_status__status_code='13'  # Approved
-        ).count(),
-        'new_applications_30d': Membership.objects.filter(
-            created_at__date__gte=last_30_days
-        ).count(),
-    }
-
-    # Payment statistics
-    payment_stats = {
-        'total_payments': MembershipPayment.objects.count(),
-        'paid_payments': MembershipPayment.objects.filter(status='paid').count(),
-        'pending_payments': MembershipPayment.objects.filter(status__in=['created', 'pending']).count(),
-        'total_revenue': MembershipPayment.objects.filter(
-            status='paid'
-        ).aggregate(total=Count('amount'))['total'] or 0,
-    }
+    # User, membership and payment statistics (cached snapshot)
+    stats = get_admin_stats()
+    user_stats = stats['user_stats']
+    membership_stats = stats['membership_stats']
+    payment_stats = stats['payment_stats']
 
     # Recent activities (system-wide for admins)
-    recent_activities = UserActivity.objects.select_related('user').order_by('-created_at')[:15]
+    recent_activities, activities_cursor = keyset_page(UserActivity.objects.select_related('user'), limit=15)
 
     # Recent applications requiring attention
     pending_memberships = Membership.objects.select_related(
@@ -155,43 +147,16 @@ def admin_dashboard(request):
         is_staff_only=True
     ).order_by('order')
 
-    # Quick actions data
-    quick_actions = [
-        {
-            'title': 'User Management',
-            'url': '/admin/auth/user/',
-            'icon': 'fas fa-users',
-            'description': 'Manage user accounts'
-        },
-        {
-            'title': 'Membership Applications',
-            'url': '/admin/memberships/membership/',
-            'icon': 'fas fa-id-card',
-            'description': 'Review applications'
-        },
-        {
-            'title': 'Payment Management',
-            'url': '/admin/memberships/membershippayment/',
-            'icon': 'fas fa-credit-card',
-            'description': 'Manage payments'
-        },
-        {
-            'title': 'Generate Reports',
-            'url': '#',
-            'icon': 'fas fa-chart-bar',
-            'description': 'View analytics'
-        },
-    ]
-
     context = {
         'user': user,
         'user_stats': user_stats,
         'membership_stats': membership_stats,
         'payment_stats': payment_stats,
         'recent_activities': recent_activities,
+        'activities_cursor': activities_cursor,
         'pending_memberships': pending_memberships,
         'widgets': widgets,
-        'quick_actions': quick_actions,
+        'quick_actions': ADMIN_QUICK_ACTIONS,
         'page_title': 'Admin Dashboard',
     }
 
@@ -204,53 +169,85 @@ def dashboard_analytics_api(request):
     if not request.user.is_staff:
         return JsonResponse({'error': 'Permission denied'}, status=403)
 
-    # Get analytics data based on request parameters
-    days = int(request.GET.get('days', 30))
-    end_date = timezone.now().date()
-    start_date = end_date - timedelta(days=days)
-
-    # Daily user registrations
-    daily_registrations = []
-    for i in range(days):
-        date = start_date + timedelta(days=i)
-        count = User.objects.filter(
-            created_at__date=date,
-            is_active=True
-        ).count()
-        daily_registrations.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'count': count
-        })
+    try:
+        days = clamp_days(request.GET.get('days'))
+    except ValueError:
+        return JsonResponse({'error': 'days must be an integer'}, status=400)
 
-    # Daily membership applications
-    daily_applications = []
-    for i in range(days):
-        date = start_date + timedelta(days=i)
-        count = Membership.objects.filter(
-            created_at__date=date
-        ).count()
-        daily_applications.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'count': count
-        })
+    return JsonResponse(get_analytics(days))
 
-    # Membership status distribution
-    status_distribution = []
-    statuses = Status.objects.filter(status_code__in=['10', '11', '12', '13', '14', '15', '16'])
-    for status in statuses:
-        count = Membership.objects.filter(workflow_status=status).count()
-        status_distribution.append({
-            'status': status.external_status,
-            'count': count
-        })
+
+def _activity_json(activity, with_user=False):
+    data = {
+        'id': activity.id,
+        'action_type': activity.action_type,
+        'action_display': activity.get_action_type_display(),
+        'description': activity.description,
+        'metadata': activity.metadata,
+        'created_at': activity.created_at.isoformat(),
+    }
+    if with_user:
+        data['user'] = {'id': activity.user_id, 'username': activity.user.username}
+    return data
+
+
+def _notification_json(notification):
+    return {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'notification_type': notification.notification_type,
+        'is_read': notification.is_read,
+        'read_at': notification.read_at.isoformat() if notification.read_at else None,
+        'action_url': notification.action_url,
+        'action_text': notification.action_text,
+        'created_at': notification.created_at.isoformat(),
+    }
+
+
+@login_required
+def activity_feed_api(request):
+    """
+    Cursor-paginated activity feed: ?cursor=<next_cursor>&limit=N.
+    Staff may pass ?scope=all for the system-wide feed.
+    """
+    system_wide = request.user.is_staff and request.GET.get('scope') == 'all'
+    queryset = UserActivity.objects.select_related('user') if system_wide else \
+        UserActivity.objects.filter(user=request.user)
+    try:
+        rows, next_cursor = keyset_page(queryset, request.GET.get('cursor'), page_size(request.GET.get('limit')))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid cursor or limit'}, status=400)
 
     return JsonResponse({
-        'daily_registrations': daily_registrations,
-        'daily_applications': daily_applications,
-        'status_distribution': status_distribution,
+        'results': [_activity_json(activity, with_user=system_wide) for activity in rows],
+        'next_cursor': next_cursor,
     })
 
 
+@login_required
+def notification_feed_api(request):
+    """Cursor-paginated notifications of the current user: ?cursor=&limit=&unread=1"""
+    queryset = Notification.objects.filter(user=request.user)
+    if request.GET.get('unread') in ('1', 'true'):
+        queryset = queryset.filter(is_read=False)
+    try:
+        rows, next_cursor = keyset_page(queryset, request.GET.get('cursor'), page_size(request.GET.get('limit')))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid cursor or limit'}, status=400)
+
+    return JsonResponse({
+        'results': [_notification_json(notification) for notification in rows],
+        'next_cursor': next_cursor,
+    })
+
+
+@login_required
+def dashboard_widgets_api(request):
+    """All dashboard widgets visible to the user, evaluated in one payload"""
+    return JsonResponse({'widgets': evaluate_widgets(visible_widgets(request.user), request.user)})
+
+
 @login_required
 def mark_notification_read(request, notification_id):
     """Mark a notification as read"""
@@ -265,6 +262,15 @@ def mark_notification_read(request, notification_id):
         return JsonResponse({'error': 'Notification not found'}, status=404)
 
 
+@login_required
+def mark_all_notifications_read(request):
+    """Mark all notifications of the current user as read"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid method'}, status=405)
+    updated = mark_all_read(request.user)
+    return JsonResponse({'success': True, 'updated': updated, 'unread': 0})
+
+
 @login_required
 def log_user_activity(request):
     """Log user activity - called via AJAX"""
@@ -272,18 +278,19 @@ def log_user_activity(request):
         import json
         data = json.loads(request.body)
 
-        activity = UserActivity.objects.create(
-            user=request.user,
-            action_type=data.get('action_type', 'unknown'),
-            description=data.get('description', ''),
+        activity = log_activity(
+            request.user,
+            data.get('action_type', 'unknown'),
+            data.get('description', ''),
             metadata=data.get('metadata', {}),
-            ip_address=request.META.get('REMOTE_ADDR'),
-            user_agent=request.META.get('HTTP_USER_AGENT', '')[:500],
+            request=request,
         )
 
         return JsonResponse({
             'success': True,
-            'activity_id': activity.id
+            # null until the buffered write (or when the event was dropped)
+            'activity_id': activity.id if activity is not None else None,
+            'queued': activity is not None,
         })
 
     return JsonResponse({'error': 'Invalid method'}, status=405)
\ No newline at end of file
@@ -0,0 +1,159 @@
+# dashboard/widgets.py
+"""
+Data-driven dashboard widgets.
+
+Each DashboardWidget.widget_type maps to a provider registered with
+@provider(); the provider receives the widget's ``config`` and the requesting
+user and returns JSON-serializable data. evaluate_widgets() serves cached
+results where it can, fetched in one get_many, and computes the rest one after
+another on the request's own database connection: a widget is a handful of
+aggregates, cheaper than opening a connection per thread to parallelize them.
+
+Common config keys:
+    cache_ttl   seconds to cache the widget data (default DASHBOARD_WIDGET_CACHE_TTL, 0 disables)
+    per_user    cache per user instead of once for everyone (implied for user-specific providers)
+"""
+import logging
+from django.conf import settings
+from django.core.cache import cache
+
+from memberships.models import Membership, MembershipPayment
+from .analytics import clamp_days, get_admin_stats, get_analytics
+from .feeds import keyset_page
+from .models import DashboardWidget, UserActivity
+
+logger = logging.getLogger(__name__)
+
+_providers = {}
+
+
+def provider(widget_type, *, per_user=False, staff=False):
+    """Register the data provider of a widget type; ``staff`` providers expose system-wide data"""
+    def decorator(func):
+        _providers[widget_type] = (func, per_user, staff)
+        return func
+    return decorator
+
+
+@provider('stats', staff=True)
+def stats_widget(config, user):
+    """config: {"group": "user_stats" | "membership_stats" | "payment_stats", "keys": [...]}"""
+    stats = get_admin_stats()[config.get('group', 'user_stats')]
+    keys = config.get('keys') or list(stats)
+    return {key: stats.get(key) for key in keys}
+
+
+@provider('chart', staff=True)
+def chart_widget(config, user):
+    """config: {"series": "daily_registrations" | "daily_applications" | "status_distribution", "days": 30}"""
+    analytics = get_analytics(clamp_days(config.get('days')))
+    return analytics[config.get('series', 'daily_registrations')]
+
+
+TABLES = {
+    'pending_memberships': lambda: (
+        Membership.objects
+        .filter(workflow_status__status_code__in=['11', '12'])
+        .order_by('-created_at')
+        .values('uuid', 'reference_no', 'user__username', 'workflow_status__external_status', 'created_at')
+    ),
+    'recent_payments': lambda: (
+        MembershipPayment.objects
+        .order_by('-created_at')
+        .values('uuid', 'receipt_no', 'membership__reference_no', 'status', 'amount', 'currency', 'created_at')
+    ),
+}
+
+
+@provider('table', staff=True)
+def table_widget(config, user):
+    """config: {"table": one of TABLES, "limit": 10}"""
+    rows = TABLES[config.get('table', 'pending_memberships')]()
+    return list(rows[:min(int(config.get('limit', 10)), 100)])
+
+
+@provider('activity', per_user=True)
+def activity_widget(config, user):
+    """config: {"limit": 10, "scope": "own" | "all"}; "all" is honoured for staff only"""
+    queryset = UserActivity.objects.select_related('user')
+    if not (user.is_staff and config.get('scope') == 'all'):
+        queryset = queryset.filter(user=user)
+    rows, next_cursor = keyset_page(queryset, limit=min(int(config.get('limit', 10)), 100))
+    return {
+        'results': [
+            {
+                'username': activity.user.username,
+                'action_type': activity.action_type,
+                'description': activity.description,
+                'created_at': activity.created_at,
+            }
+            for activity in rows
+        ],
+        'next_cursor': next_cursor,
+    }
+
+
+@provider('quick_actions')
+def quick_actions_widget(config, user):
+    """config: {"actions": [{"title": ..., "url": ..., "icon": ...}, ...]}"""
+    return config.get('actions', [])
+
+
+def visible_widgets(user):
+    widgets = DashboardWidget.objects.filter(is_active=True)
+    if not user.is_staff:
+        widgets = widgets.filter(is_staff_only=False)
+    return widgets.order_by('order', 'name')
+
+
+def _cache_key(widget, user, per_user):
+    version = widget.modified_at.timestamp() if widget.modified_at else 0
+    scope = user.pk if per_user or widget.config.get('per_user') else 'all'
+    return f'dashboard:widget:{widget.pk}:{version}:{scope}'
+
+
+def _compute(func, widget, user):
+    try:
+        return {'data': func(widget.config, user)}
+    except Exception:
+        logger.exception("Dashboard widget %s (%s) failed", widget.pk, widget.widget_type)
+        return {'error': 'Widget data unavailable'}
+
+
+def evaluate_widgets(widgets, user):
+    """[{id, name, type, title, data | error}] for ``widgets``, cached per widget"""
+    widgets = list(widgets)
+    results = {}
+    keys = {}
+    for widget in widgets:
+        if widget.widget_type not in _providers:
+            results[widget.pk] = {'error': f"Unknown widget type '{widget.widget_type}'"}
+            continue
+        if _providers[widget.widget_type][2] and not user.is_staff:
+            results[widget.pk] = {'error': 'Permission denied'}
+            continue
+        keys[widget.pk] = _cache_key(widget, user, _providers[widget.widget_type][1])
+
+    cached = cache.get_many(list(keys.values()))
+    pending = [w for w in widgets if w.pk in keys and keys[w.pk] not in cached]
+    for widget in widgets:
+        if widget.pk in keys and keys[widget.pk] in cached:
+            results[widget.pk] = {'data': cached[keys[widget.pk]]}
+
+    for widget in pending:
+        result = _compute(_providers[widget.widget_type][0], widget, user)
+        results[widget.pk] = result
+        ttl = int(widget.config.get('cache_ttl', settings.DASHBOARD_WIDGET_CACHE_TTL))
+        if 'data' in result and ttl > 0:
+            cache.set(keys[widget.pk], result['data'], ttl)
+
+    return [
+        {
+            'id': widget.pk,
+            'name': widget.name,
+            'type': widget.widget_type,
+            'title': widget.title,
+            **results[widget.pk],
+        }
+        for widget in widgets
+    ]
@@ -0,0 +1,100 @@
+# memberships/api/longpoll.py
+"""
+Long-poll endpoint for the payment status shown next to the HitPay QR code.
+
+GET payments/<uuid>/status/?since=<status>&timeout=<seconds>
+
+Answers immediately when the payment status differs from ``since``; otherwise
+holds the request (as a coroutine, under ASGI) until the webhook changes the
+status, which is signalled through core.pubsub, or until the timeout. The
+client simply re-issues the request with the status it got back, after
+``poll_after`` seconds.
+
+Under WSGI a held request would tie up a worker thread for the whole wait, so
+there the endpoint answers at once and asks for PAYMENT_POLL_INTERVAL seconds
+between requests instead: a plain poll, but never a tight loop.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+
+from core import pubsub
+from memberships.models import MembershipPayment
+from users.authentication import CachedJWTAuthentication
+
+
+def payment_channel(uuid):
+    return f"payments:{uuid}"
+
+
+def _envelope(data=None, message="OK", error=None, status=200):
+    return JsonResponse(
+        {"success": error is None, "message": message, "error": error, "data": data}, status=status
+    )
+
+
+async def _request_user(request):
+    """Session user, or the user of a Bearer access token"""
+    user = await request.auser()
+    if user.is_authenticated:
+        return user
+    try:
+        result = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+async def _payment_state(uuid):
+    return await (
+        MembershipPayment.objects
+        .filter(uuid=uuid)
+        .values("uuid", "status", "paid_at", "membership__user_id")
+        .afirst()
+    )
+
+
+async def payment_status_longpoll(request, uuid):
+    user = await _request_user(request)
+    if user is None:
+        return _envelope(message="Error", error="Authentication credentials were not provided.", status=401)
+
+    state = await _payment_state(uuid)
+    if state is None or (state["membership__user_id"] != user.pk and not user.is_staff):
+        return _envelope(message="Error", error="Payment not found.", status=404)
+
+    try:
+        timeout = float(request.GET.get("timeout") or settings.PAYMENT_LONGPOLL_TIMEOUT)
+    except ValueError:
+        return _envelope(message="Error", error="timeout must be a number.", status=400)
+    timeout = max(0.0, min(timeout, settings.PAYMENT_LONGPOLL_TIMEOUT))
+    poll_after = 0
+    if not pubsub.under_asgi(request):
+        timeout, poll_after = 0.0, settings.PAYMENT_POLL_INTERVAL
+
+    since = request.GET.get("since")
+    channel = payment_channel(uuid)
+    channels = {channel: await pubsub.acurrent_seq(channel)}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    # re-read after subscribing so a change in between is not missed
+    state = await _payment_state(uuid)
+    while since is not None and state["status"] == since:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        latest, messages = await pubsub.listen(channels, timeout=remaining)
+        if messages or latest != channels:
+            channels = latest
+            state = await _payment_state(uuid)
+
+    return _envelope({
+        "uuid": str(state["uuid"]),
+        "status": state["status"],
+        "paid_at": state["paid_at"].isoformat() if state["paid_at"] else None,
+        "changed": since is not None and state["status"] != since,
+        "poll_after": poll_after,
+    })
@@ -8,6 +8,7 @@ from .views import (
     MembershipTypeListAPIView,
     HitPayWebhookView
 )
+from .longpoll import payment_status_longpoll
 
 router = DefaultRouter()
 router.register(r"", MembershipViewSet, basename="memberships")
@@ -18,6 +19,9 @@ urlpatterns = [
     path("institutions/", InstitutionListAPIView.as_view(), name="institutions-list"),
     path("membership-types/", MembershipTypeListAPIView.as_view(), name="membership-types-list"),
 
+    # Payment status long-poll (used by the QR payment page)
+    path("payments/<uuid:uuid>/status/", payment_status_longpoll, name="payment-status-longpoll"),
+
     # Webhooks
     path("payments/webhooks/hitpay/", HitPayWebhookView.as_view(), name="hitpay-webhook"),
 ]
@@ -9,6 +9,7 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from drf_spectacular.utils import extend_schema, OpenApiExample
 
 from core.responses import ok, fail
+from core.throttling import LookupThrottle, WebhookThrottle
 from memberships.models import Membership, EducationLevel, Institution, MembershipType, MembershipPayment
 
 # Import ONLY the new serializers
@@ -25,6 +26,7 @@ from .serializers import (
 )
 
 LOOKUP_PERMISSION = AllowAny
+LOOKUP_THROTTLES = [LookupThrottle]
 
 
 class MembershipViewSet(mixins.RetrieveModelMixin,
@@ -235,6 +237,7 @@ class MembershipViewSet(mixins.RetrieveModelMixin,
 @extend_schema(tags=["Lookups"], summary="List education levels")
 class EducationLevelListAPIView(ListAPIView):
     permission_classes = [LOOKUP_PERMISSION]
+    throttle_classes = LOOKUP_THROTTLES
     serializer_class = EducationLevelListSerializer
 
     def get_queryset(self):
@@ -249,6 +252,7 @@ class EducationLevelListAPIView(ListAPIView):
 @extend_schema(tags=["Lookups"], summary="List institutions")
 class InstitutionListAPIView(ListAPIView):
     permission_classes = [LOOKUP_PERMISSION]
+    throttle_classes = LOOKUP_THROTTLES
     serializer_class = InstitutionListSerializer
 
     def get_queryset(self):
@@ -263,6 +267,7 @@ class InstitutionListAPIView(ListAPIView):
 @extend_schema(tags=["Lookups"], summary="List membership types")
 class MembershipTypeListAPIView(ListAPIView):
     permission_classes = [LOOKUP_PERMISSION]
+    throttle_classes = LOOKUP_THROTTLES
     serializer_class = MembershipTypeListSerializer
 
     def get_queryset(self):
@@ -278,6 +283,7 @@ class MembershipTypeListAPIView(ListAPIView):
 @extend_schema(tags=["Payments"], summary="HitPay webhook handler")
 class HitPayWebhookView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [WebhookThrottle]
 
     @method_decorator(csrf_exempt)
     def dispatch(self, *args, **kwargs):
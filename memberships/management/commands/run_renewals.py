@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from memberships.services.renewals import run_renewals
+
+
+class Command(BaseCommand):
+    help = "Run the annual renewal cycle: create renewal invoices and lapse expired memberships"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, default=timezone.now().year)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--no-lapse", action="store_true", help="Only create renewal invoices")
+        parser.add_argument("--dry-run", action="store_true", help="Only count invoices and lapses")
+
+    def handle(self, *args, **opts):
+        result = run_renewals(
+            opts["year"],
+            lapse=not opts["no_lapse"],
+            batch_size=opts["batch_size"],
+            dry_run=opts["dry_run"],
+        )
+        prefix = "[dry run] " if opts["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{result['invoices']} renewal invoices for {result['year']} "
+            f"({result['free']} free renewals, {result['unpriced']} without profile info), "
+            f"{result.get('lapsed', 0)} memberships lapsed in {result['elapsed']}s"
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from memberships.services.reminders import send_payment_reminders
+
+
+class Command(BaseCommand):
+    help = "Remind members whose application is stuck in Pending Payment (schedule daily)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--overdue-days", type=int, help="Days since submission before reminding")
+        parser.add_argument("--window-days", type=int, help="Do not re-remind a member within this many days")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true", help="Only count who would be reminded")
+
+    def handle(self, *args, **opts):
+        stats = send_payment_reminders(
+            overdue_days=opts["overdue_days"],
+            window_days=opts["window_days"],
+            batch_size=opts["batch_size"],
+            dry_run=opts["dry_run"],
+        )
+        prefix = "[dry run] " if opts["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Reminded {stats['reminded']} applications in {stats['batches']} batches: "
+            f"{stats['notifications']} notifications, {stats['emails']} emails queued "
+            f"(campaigns {', '.join(map(str, stats['campaigns'])) or '-'})"
+        ))
+        self.stdout.write(
+            f"select {stats['timings']['select']}s, write {stats['timings']['write']}s, "
+            f"total {stats['elapsed']}s"
+        )
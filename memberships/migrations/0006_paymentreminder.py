@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:14
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memberships', '0005_remove_contactinfo__nric_fin_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sent_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('membership', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_reminders', to='memberships.membership')),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='memberships.membershippayment')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['membership', '-sent_at'], name='memb_reminder_member_sent_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:15
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_mailcampaign_maildelivery'),
+        ('memberships', '0006_paymentreminder'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MembershipPeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('year', models.PositiveIntegerField()),
+                ('valid_from', models.DateField()),
+                ('valid_until', models.DateField()),
+                ('fee', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending Payment'), ('active', 'Active'), ('lapsed', 'Lapsed')], default='pending', max_length=16)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='membership',
+            name='renewal_status',
+            field=models.CharField(blank=True, choices=[('active', 'Active'), ('lapsed', 'Lapsed')], max_length=16),
+        ),
+        migrations.AddField(
+            model_name='membership',
+            name='valid_from',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='membership',
+            name='valid_until',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='membership',
+            index=models.Index(fields=['renewal_status', 'valid_until'], name='memb_renewal_status_valid_idx'),
+        ),
+        migrations.AddField(
+            model_name='membershipperiod',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s_set', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='membershipperiod',
+            name='membership',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='periods', to='memberships.membership'),
+        ),
+        migrations.AddField(
+            model_name='membershipperiod',
+            name='modified_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='modified_%(class)s_set', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='membershipperiod',
+            name='payment',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='periods', to='memberships.membershippayment'),
+        ),
+        migrations.AddIndex(
+            model_name='membershipperiod',
+            index=models.Index(fields=['year', 'status'], name='memb_period_year_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='membershipperiod',
+            constraint=models.UniqueConstraint(fields=('membership', 'year'), name='memb_period_unique_year'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import migrations
+from django.utils import timezone
+
+APPROVED_STATUS = "13"
+
+
+def backfill_periods(apps, schema_editor):
+    """
+    Give memberships approved before renewals existed a period for the current
+    year, paid by their latest paid payment for that year if there is one, so
+    lapse_expired and the renewal run see them like newly approved members.
+    """
+    Membership = apps.get_model('memberships', 'Membership')
+    MembershipPayment = apps.get_model('memberships', 'MembershipPayment')
+    MembershipPeriod = apps.get_model('memberships', 'MembershipPeriod')
+
+    year = timezone.localdate().year
+    valid_from, valid_until = date(year, 1, 1), date(year, 12, 31)
+    approved = (
+        Membership.objects
+        .filter(workflow_status__status_code=APPROVED_STATUS, renewal_status='')
+        .exclude(periods__year=year)
+        .select_related('membership_type')
+    )
+    for membership in approved.iterator(chunk_size=500):
+        payment = (
+            MembershipPayment.objects
+            .filter(membership=membership, status='paid', period_year=year)
+            .order_by('-paid_at')
+            .first()
+        )
+        if payment is not None:
+            fee = payment.amount
+        elif membership.membership_type is not None:
+            fee = membership.membership_type.amount
+        else:
+            fee = Decimal('0.00')
+        MembershipPeriod.objects.create(
+            membership=membership, year=year, valid_from=valid_from, valid_until=valid_until,
+            fee=fee, status='active', payment=payment,
+        )
+        Membership.objects.filter(pk=membership.pk).update(
+            renewal_status='active',
+            valid_from=membership.valid_from or valid_from,
+            valid_until=valid_until,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memberships', '0007_membership_renewals'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_periods, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,7 @@ from decimal import Decimal
 from django.conf import settings
 from django.core.validators import RegexValidator
 from django.db import models, transaction
+from django.db.models import Case, F, Q, Value, When
 from django.utils import timezone
 from core.models import AuditModel, Status
 from core.utils.encryption import encrypt_data, decrypt_data
@@ -249,6 +250,20 @@ class Membership(AuditModel):
     is_payment_generated = models.BooleanField(default=False)
     submitted_at = models.DateTimeField(blank=True, null=True)
 
+    # Renewal tracking, denormalized from MembershipPeriod
+    RENEWAL_STATUS_CHOICES = (
+        ("active", "Active"),
+        ("lapsed", "Lapsed"),
+    )
+    valid_from = models.DateField(blank=True, null=True)
+    valid_until = models.DateField(blank=True, null=True)
+    renewal_status = models.CharField(max_length=16, choices=RENEWAL_STATUS_CHOICES, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["renewal_status", "valid_until"], name="memb_renewal_status_valid_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.reference_no:
             self.reference_no = self.generate_reference_no()
@@ -293,6 +308,27 @@ class Membership(AuditModel):
 
         return base_amount
 
+    @staticmethod
+    def fee_expression(as_of: date):
+        """
+        Database-side equivalent of calculate_membership_fee() as of a given date,
+        for annotating fees over a whole queryset at once.
+        """
+        def years_before(years):
+            try:
+                return as_of.replace(year=as_of.year - years)
+            except ValueError:  # 29 Feb
+                return as_of.replace(year=as_of.year - years, day=28)
+
+        dob = "profile_info__date_of_birth"
+        discounted = Q(**{f"{dob}__lte": years_before(60)}) | Q(**{f"{dob}__gt": years_before(19)})
+        return Case(
+            When(Q(membership_type__isnull=True) | Q(profile_info__isnull=True), then=Value(Decimal("0.00"))),
+            When(discounted, then=F("membership_type__amount") / 2),
+            default=F("membership_type__amount"),
+            output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        )
+
     def can_edit(self):
         """Check if membership can be edited"""
         if not self.workflow_status:
@@ -409,6 +445,51 @@ class PaymentLog(AuditModel):
         return f"{self.payment_id} {self.old_status} -> {self.new_status}"
 
 
+class MembershipPeriod(AuditModel):
+    """One validity period (calendar year) of a membership and the invoice that pays for it"""
+    STATUS_CHOICES = (
+        ("pending", "Pending Payment"),
+        ("active", "Active"),
+        ("lapsed", "Lapsed"),
+    )
+
+    membership = models.ForeignKey(Membership, on_delete=models.CASCADE, related_name="periods")
+    year = models.PositiveIntegerField()
+    valid_from = models.DateField()
+    valid_until = models.DateField()
+    fee = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default="pending")
+    payment = models.ForeignKey(MembershipPayment, on_delete=models.SET_NULL, blank=True, null=True,
+                                related_name="periods")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["membership", "year"], name="memb_period_unique_year"),
+        ]
+        indexes = [
+            models.Index(fields=["year", "status"], name="memb_period_year_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.membership_id} {self.year} ({self.status})"
+
+
+class PaymentReminder(models.Model):
+    """Ledger of pending-payment reminders, used to avoid re-mailing a member within a window"""
+    membership = models.ForeignKey(Membership, on_delete=models.CASCADE, related_name="payment_reminders")
+    payment = models.ForeignKey(MembershipPayment, on_delete=models.SET_NULL, blank=True, null=True,
+                                related_name="+")
+    sent_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["membership", "-sent_at"], name="memb_reminder_member_sent_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.membership_id} reminded at {self.sent_at}"
+
+
 class WorkflowLog(AuditModel):
     membership = models.ForeignKey(Membership, on_delete=models.SET_NULL, null=True)
     old_status = models.ForeignKey(Status, on_delete=models.SET_NULL, blank=True, null=True,
@@ -1,7 +1,10 @@
+from django.db import transaction
 from django.db.models.signals import pre_save, post_save
 from django.dispatch import receiver
 
+from core import pubsub
 from core.models import Status
+from memberships.api.longpoll import payment_channel
 from memberships.models import MembershipPayment, PaymentLog
 
 @receiver(pre_save, sender=MembershipPayment)
@@ -24,11 +27,26 @@ def _log_payment_status(sender, instance: MembershipPayment, created: bool, **kw
         PaymentLog.objects.create(payment=instance, old_status=prev, new_status=instance.status)
 
 
+@receiver(post_save, sender=MembershipPayment)
+def _publish_payment_status(sender, instance: MembershipPayment, created: bool, **kwargs):
+    # wakes long-polling clients waiting on this payment (memberships.api.longpoll)
+    if not created and getattr(instance, "_prev_status", None) != instance.status:
+        channel, status = payment_channel(instance.uuid), instance.status
+        transaction.on_commit(lambda: pubsub.publish(channel, {"status": status}))
+
+
 @receiver(post_save, sender=MembershipPayment)
 def _maybe_advance_membership(sender, instance: MembershipPayment, created: bool, **kwargs):
     # when a payment turns paid, move membership to next status (e.g., "pending_approval": code "12")
     if instance.status == "paid":
         m = instance.membership
+        if m is None:
+            return
+        if (instance.metadata or {}).get("kind") == "renewal":
+            # renewal invoices extend an approved membership instead of re-entering approval
+            from memberships.services.renewals import renew_from_payment
+            renew_from_payment(instance)
+            return
         try:
             next_status = Status.objects.get(status_code="12")  # adjust to your next step
         except Status.DoesNotExist:
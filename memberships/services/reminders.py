@@ -0,0 +1,133 @@
+# memberships/services/reminders.py
+"""
+Pending-payment reminders.
+
+Selects applications stuck in "Pending Payment" (status 11) in a single joined
+query, skips members already reminded within the window, then for each batch
+bulk-inserts dashboard notifications, ledger rows and email recipients. Each
+batch gets its own mail campaign, queued in the transaction that writes its
+ledger rows, so a run that fails part-way leaves every reminded member with a
+queued email. The emails themselves go out through the bulk mailing engine
+(send_mail_campaigns).
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+from django.urls import reverse
+from django.utils import timezone
+
+from core.services.mailing import add_recipients, create_campaign, mark_queued
+from core.utils.batching import chunked_values
+from dashboard.models import Notification
+from dashboard.notifications import invalidate_unread
+from memberships.models import Membership, MembershipPayment, PaymentReminder
+
+PENDING_PAYMENT_STATUS = "11"
+
+
+def overdue_applications(*, overdue_days: int, window_days: int, now=None):
+    """
+    Memberships pending payment for at least ``overdue_days`` that have not been
+    reminded in the last ``window_days``, annotated with their open payment.
+    """
+    now = now or timezone.now()
+    reminded_recently = PaymentReminder.objects.filter(
+        membership=OuterRef("pk"), sent_at__gte=now - timedelta(days=window_days)
+    )
+    open_payment = MembershipPayment.objects.filter(
+        membership=OuterRef("pk"), status__in=["created", "pending"]
+    ).order_by("-created_at")
+
+    return (
+        Membership.objects
+        .filter(
+            workflow_status__status_code=PENDING_PAYMENT_STATUS,
+            submitted_at__lte=now - timedelta(days=overdue_days),
+            user__is_active=True,
+        )
+        .exclude(user__email__isnull=True)
+        .exclude(user__email="")
+        .filter(~Exists(reminded_recently))
+        .annotate(
+            payment_id=Subquery(open_payment.values("id")[:1]),
+            payment_amount=Subquery(open_payment.values("amount")[:1]),
+            payment_currency=Subquery(open_payment.values("currency")[:1]),
+        )
+    )
+
+
+def send_payment_reminders(*, overdue_days: int | None = None, window_days: int | None = None,
+                           batch_size: int = 500, dry_run: bool = False) -> dict:
+    """Create notifications, ledger rows and queued emails for overdue applications."""
+    overdue_days = settings.PAYMENT_REMINDER_OVERDUE_DAYS if overdue_days is None else overdue_days
+    window_days = settings.PAYMENT_REMINDER_WINDOW_DAYS if window_days is None else window_days
+
+    started = time.monotonic()
+    now = timezone.now()
+    queryset = overdue_applications(overdue_days=overdue_days, window_days=window_days, now=now)
+    fields = ("reference_no", "user_id", "user__email", "payment_id", "payment_amount", "payment_currency")
+
+    stats = {"reminded": 0, "notifications": 0, "emails": 0, "batches": 0, "campaigns": []}
+    timings = {"select": 0.0, "write": 0.0}
+    # emails need an absolute link
+    action_url = settings.SITE_URL + reverse("public_dashboard")
+
+    rows_iter = chunked_values(queryset, *fields, chunk_size=batch_size)
+    while True:
+        t0 = time.monotonic()
+        rows = next(rows_iter, None)
+        timings["select"] += time.monotonic() - t0
+        if rows is None:
+            break
+
+        stats["batches"] += 1
+        stats["reminded"] += len(rows)
+        if dry_run:
+            continue
+
+        t0 = time.monotonic()
+        with transaction.atomic():
+            campaign = create_campaign(
+                "Complete your membership payment",
+                name=f"Payment reminders {now:%Y-%m-%d} #{stats['batches']}",
+                template_name="mailing/email/payment_reminder.html",
+                context={"action_url": action_url},
+            )
+            notifications = [
+                Notification(
+                    user_id=user_id,
+                    title="Payment pending",
+                    message=f"Your membership application {reference_no} is awaiting payment.",
+                    notification_type="warning",
+                    action_url=action_url,
+                    action_text="Complete payment",
+                )
+                for _, reference_no, user_id, _, _, _, _ in rows
+            ]
+            Notification.objects.bulk_create(notifications, batch_size=batch_size)
+            invalidate_unread(*{user_id for _, _, user_id, _, _, _, _ in rows})
+            PaymentReminder.objects.bulk_create(
+                [PaymentReminder(membership_id=pk, payment_id=payment_id, sent_at=now)
+                 for pk, _, _, _, payment_id, _, _ in rows],
+                batch_size=batch_size,
+            )
+            add_recipients(campaign, (
+                (user_id, email, {
+                    "reference_no": reference_no,
+                    "amount": str(amount) if amount is not None else None,
+                    "currency": currency,
+                })
+                for _, reference_no, user_id, email, _, amount, currency in rows
+            ))
+            # the ledger rows take these members out of overdue_applications
+            stats["emails"] += mark_queued(campaign)
+        timings["write"] += time.monotonic() - t0
+        stats["notifications"] += len(notifications)
+        stats["campaigns"].append(campaign.pk)
+
+    stats["timings"] = {key: round(value, 3) for key, value in timings.items()}
+    stats["elapsed"] = round(time.monotonic() - started, 3)
+    return stats
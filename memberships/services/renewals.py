@@ -0,0 +1,286 @@
+# memberships/services/renewals.py
+"""
+Annual membership renewal cycle.
+
+Memberships are valid per calendar year (MembershipPeriod). The yearly run
+computes every renewal fee in the database (Membership.fee_expression), then
+bulk-inserts periods and their invoices chunk by chunk. Memberships whose fee
+is zero get an active period without an invoice; those without profile info
+(no age, so no fee) are reported instead. Paying a renewal invoice activates its
+period (see payment_signals), and members whose validity ended more than the
+grace period ago are lapsed with bulk updates.
+
+An application approved on or after MEMBERSHIP_ROLLOVER_MONTH is valid from the
+approval date until the end of the following year, rather than for the few
+weeks left in the current one.
+
+The current validity is denormalized onto Membership.renewal_status/valid_until
+so "active members" is an indexed lookup rather than a join over payments.
+
+The bulk inserts and updates here bypass the model signals, so they write the
+PaymentLog/WorkflowLog rows themselves and apply the daily rollup changes
+(dashboard.rollups) and the admin stats invalidation explicitly. Renewal
+invoices are created pending, so there is no status change to publish.
+"""
+import logging
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from core.models import Status
+from core.utils.batching import chunked_values
+from dashboard import rollups
+from dashboard.analytics import invalidate_admin_stats
+from memberships.models import Membership, MembershipPayment, MembershipPeriod, PaymentLog, WorkflowLog
+
+logger = logging.getLogger(__name__)
+
+APPROVED_STATUS = "13"
+LAPSED_STATUS = "17"
+
+
+def year_bounds(year: int) -> tuple[date, date]:
+    return date(year, 1, 1), date(year, 12, 31)
+
+
+def active_members(on: date | None = None):
+    """Memberships valid on the given date (defaults to today)"""
+    on = on or timezone.localdate()
+    return Membership.objects.filter(renewal_status="active", valid_until__gte=on)
+
+
+def _status(code, name):
+    status, created = Status.objects.get_or_create(
+        status_code=code, defaults={"internal_status": name, "external_status": name},
+    )
+    if created:
+        logger.warning(f"Status {code} ({name}) was missing and has been created; run seed_status")
+    return status
+
+
+def _lapsed_status():
+    return _status(LAPSED_STATUS, "Lapsed")
+
+
+def _approved_status():
+    return _status(APPROVED_STATUS, "Approved")
+
+
+def approval_period_start(on: date | None = None) -> tuple[int, date]:
+    """(period year, valid_from) for an application approved on ``on`` (defaults to today)"""
+    on = on or timezone.localdate()
+    if on.month >= settings.MEMBERSHIP_ROLLOVER_MONTH:
+        return on.year + 1, on
+    return on.year, year_bounds(on.year)[0]
+
+
+def renewable_memberships(year: int):
+    """Approved or lapsed memberships with a priced type and no period or invoice for ``year`` yet"""
+    return (
+        Membership.objects
+        .filter(
+            is_active=True,
+            workflow_status__status_code__in=[APPROVED_STATUS, LAPSED_STATUS],
+            membership_type__amount__isnull=False,
+        )
+        .filter(~Exists(MembershipPeriod.objects.filter(membership=OuterRef("pk"), year=year)))
+        .filter(~Exists(MembershipPayment.objects.filter(membership=OuterRef("pk"), period_year=year)))
+    )
+
+
+def _next_receipt_numbers(count: int):
+    """Continue the BMR-YY-NNN sequence used by MembershipPayment.generate_receipt_no for ``count`` rows"""
+    prefix = f"BMR-{timezone.now().year % 100:02d}-"
+    start = MembershipPayment.objects.filter(receipt_no__startswith=prefix).count() + 1
+    return [f"{prefix}{n:03d}" for n in range(start, start + count)]
+
+
+def create_renewal_invoices(year: int, *, as_of: date | None = None, batch_size: int = 500,
+                            dry_run: bool = False) -> dict:
+    """
+    Create a pending MembershipPeriod plus invoice for every renewable membership.
+    Fees are age-adjusted as of ``as_of`` (defaults to today), computed in the database.
+    Zero-fee memberships get an active period directly; memberships without profile
+    info cannot be priced and are only counted (and logged) as "unpriced".
+    """
+    as_of = as_of or timezone.localdate()
+    valid_from, valid_until = year_bounds(year)
+    due_date = valid_from + timedelta(days=settings.MEMBERSHIP_RENEWAL_GRACE_DAYS)
+    queryset = renewable_memberships(year).annotate(renewal_fee=Membership.fee_expression(as_of))
+
+    created = free = 0
+    unpriced = []
+    for rows in chunked_values(queryset, "renewal_fee", "profile_info_id", chunk_size=batch_size):
+        unpriced += [pk for pk, _, profile_id in rows if profile_id is None]
+        priced = [(pk, Decimal(fee or 0).quantize(Decimal("0.01"))) for pk, fee, profile_id in rows
+                  if profile_id is not None]
+        rows = [(pk, fee) for pk, fee in priced if fee]
+        free_ids = [pk for pk, fee in priced if not fee]
+        free += len(free_ids)
+        if not dry_run:
+            for membership in Membership.objects.filter(pk__in=free_ids).select_related("workflow_status"):
+                with transaction.atomic():
+                    activate_period(membership, year, fee=Decimal("0.00"))
+                    _reinstate(membership, year)
+        if dry_run or not rows:
+            created += len(rows)
+            continue
+
+        with transaction.atomic():
+            receipt_numbers = _next_receipt_numbers(len(rows))
+            payments = MembershipPayment.objects.bulk_create([
+                MembershipPayment(
+                    membership_id=pk,
+                    method="bank_transfer",  # generic pending invoice; user can switch to online later
+                    status="pending",
+                    receipt_no=receipt_no,
+                    amount=fee,
+                    currency="SGD",
+                    period_year=year,
+                    due_date=due_date,
+                    description=f"Membership fee {year}",
+                    metadata={"kind": "renewal", "period_year": year},
+                )
+                for (pk, fee), receipt_no in zip(rows, receipt_numbers)
+            ])
+            PaymentLog.objects.bulk_create([
+                PaymentLog(payment=payment, old_status=None, new_status=payment.status, note="created")
+                for payment in payments
+            ])
+            rollups.payments_created(payments)
+            MembershipPeriod.objects.bulk_create([
+                MembershipPeriod(
+                    membership_id=pk,
+                    year=year,
+                    valid_from=valid_from,
+                    valid_until=valid_until,
+                    fee=fee,
+                    payment=payment,
+                )
+                for (pk, fee), payment in zip(rows, payments)
+            ])
+        created += len(rows)
+
+    if not dry_run and (created or free):
+        invalidate_admin_stats()
+    if unpriced:
+        logger.warning(f"No renewal for {year} created for {len(unpriced)} memberships without profile "
+                       f"info (fee unknown): {unpriced[:50]}")
+    return {"year": year, "invoices": created, "free": free, "unpriced": len(unpriced)}
+
+
+def activate_period(membership: Membership, year: int, *, payment: MembershipPayment | None = None,
+                    fee: Decimal | None = None, valid_from: date | None = None):
+    """
+    Mark the membership valid for ``year`` (creating the period if needed, starting
+    at ``valid_from`` or 1 January) and refresh its denormalized renewal state.
+    Used on approval, on renewal payment and for zero-fee renewals.
+    """
+    year_start, valid_until = year_bounds(year)
+    if fee is None:
+        fee = payment.amount if payment else membership.calculate_membership_fee()
+    period, created = MembershipPeriod.objects.get_or_create(
+        membership=membership,
+        year=year,
+        defaults={
+            "valid_from": valid_from or year_start,
+            "valid_until": valid_until,
+            "fee": fee,
+            "status": "active",
+            "payment": payment,
+        },
+    )
+    if not created and period.status != "active":
+        period.status = "active"
+        period.payment = period.payment or payment
+        period.save(update_fields=["status", "payment", "modified_at", "modified_by"])
+
+    updates = {"renewal_status": "active"}
+    if not membership.valid_until or membership.valid_until < period.valid_until:
+        updates["valid_until"] = period.valid_until
+    if not membership.valid_from:
+        updates["valid_from"] = period.valid_from
+    # queryset update: avoid re-running the Membership save signals
+    Membership.objects.filter(pk=membership.pk).update(**updates)
+    for field, value in updates.items():
+        setattr(membership, field, value)
+    return period
+
+
+def _reinstate(membership: Membership, year: int):
+    """Move a lapsed membership back to approved"""
+    if membership.workflow_status and membership.workflow_status.status_code == LAPSED_STATUS:
+        approved = _approved_status()
+        Membership.objects.filter(pk=membership.pk).update(workflow_status=approved)
+        rollups.memberships_moved([(membership.created_at, membership.workflow_status_id)], approved.pk)
+        WorkflowLog.objects.create(
+            membership=membership,
+            old_status=membership.workflow_status,
+            new_status=approved,
+            reason=f"Renewed for {year}",
+        )
+        membership.workflow_status = approved
+
+
+def renew_from_payment(payment: MembershipPayment):
+    """Activate the period a paid renewal invoice belongs to, reinstating a lapsed membership"""
+    membership = payment.membership
+    if membership is None:
+        return None
+    year = (payment.metadata or {}).get("period_year") or payment.period_year
+    if not year:
+        logger.warning(f"Renewal payment {payment.pk} has no period year; membership {membership.pk} not renewed")
+        return None
+    period = activate_period(membership, year, payment=payment)
+    _reinstate(membership, year)
+    return period
+
+
+def lapse_expired(*, as_of: date | None = None, batch_size: int = 500, dry_run: bool = False) -> dict:
+    """
+    Lapse every active membership whose validity ended more than the grace period
+    before ``as_of``, together with its unpaid periods, using bulk updates.
+    """
+    as_of = as_of or timezone.localdate()
+    cutoff = as_of - timedelta(days=settings.MEMBERSHIP_RENEWAL_GRACE_DAYS)
+    expired = Membership.objects.filter(renewal_status="active", valid_until__lt=cutoff)
+    if dry_run:
+        return {"lapsed": expired.count()}
+
+    lapsed_status = _lapsed_status()
+    reason = f"Membership not renewed (expired before {cutoff})"
+    lapsed = 0
+    for rows in chunked_values(expired, "workflow_status_id", "created_at", chunk_size=batch_size):
+        ids = [pk for pk, _, _ in rows]
+        now = timezone.now()
+        with transaction.atomic():
+            Membership.objects.filter(pk__in=ids).update(
+                renewal_status="lapsed", workflow_status=lapsed_status, modified_at=now
+            )
+            MembershipPeriod.objects.filter(
+                membership_id__in=ids, status="pending", valid_until__lt=cutoff
+            ).update(status="lapsed", modified_at=now)
+            WorkflowLog.objects.bulk_create([
+                WorkflowLog(membership_id=pk, old_status_id=old_status_id, new_status=lapsed_status, reason=reason)
+                for pk, old_status_id, _ in rows
+            ])
+            rollups.memberships_moved([(created_at, old_status_id) for _, old_status_id, created_at in rows],
+                                      lapsed_status.pk)
+        lapsed += len(ids)
+    if lapsed:
+        invalidate_admin_stats()
+    return {"lapsed": lapsed}
+
+
+def run_renewals(year: int, *, lapse: bool = True, batch_size: int = 500, dry_run: bool = False) -> dict:
+    started = time.monotonic()
+    result = create_renewal_invoices(year, batch_size=batch_size, dry_run=dry_run)
+    if lapse:
+        result.update(lapse_expired(batch_size=batch_size, dry_run=dry_run))
+    result["elapsed"] = round(time.monotonic() - started, 3)
+    return result
@@ -56,4 +56,23 @@ def _log_status_change(sender, instance: Membership, created: bool, **kwargs):
         new_status=instance.workflow_status,  # ForeignKey to Status
         action_by=actor,
         reason=instance.reason,  # optional: copy membership.reason if you use it
-    )
\ No newline at end of file
+    )
+
+@receiver(post_save, sender=Membership)
+def _activate_on_approval(sender, instance: Membership, created: bool, **kwargs):
+    """
+    When an application is approved, start its validity period: the current year,
+    or through next year from MEMBERSHIP_ROLLOVER_MONTH on (see approval_period_start).
+    """
+    prev_id = getattr(instance, "_prev_workflow_status_id", None)
+    if prev_id == instance.workflow_status_id or not instance.workflow_status_id:
+        return
+    if instance.workflow_status.status_code != "13" or instance.renewal_status == "active":
+        return
+
+    from memberships.services.renewals import activate_period, approval_period_start
+
+    year, valid_from = approval_period_start()
+    payment = (instance.payments.filter(status="paid", period_year__in=[valid_from.year, year])
+               .order_by("-paid_at").first())
+    activate_period(instance, year, payment=payment, valid_from=valid_from)
@@ -11,6 +11,7 @@ from .serializers import (
     PromoteToStaffSerializer, AssignRolesSerializer, RoleSerializer, SelfProfileUpdateSerializer
 )
 from core.responses import ok, fail
+from core.throttling import LookupThrottle
 
 class MeViewSet(viewsets.GenericViewSet):
     permission_classes = [IsAuthenticated]
@@ -57,6 +58,7 @@ class PublicUsersViewSet(mixins.RetrieveModelMixin, mixins.ListModelMixin, views
     serializer_class = UserPublicSerializer
     lookup_field = "uuid"
     permission_classes = [AllowAny]
+    throttle_classes = [LookupThrottle]
 
     @extend_schema(
         responses={200: PublicUsersListEnvelopeSerializer()},
@@ -0,0 +1,54 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import VERSION_CLAIM, cached_user, token_version
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the user through users.tokens.cached_user,
+    so a request with a warm cache runs no authentication query and finds
+    ``profile`` and ``roles`` already loaded. Tokens whose ``ver`` claim no
+    longer matches the password are rejected.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        # tokens issued before the claim existed carry no version
+        if validated_token.get(VERSION_CLAIM, token_version(user)) != token_version(user):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+
+class ClaimsUser(TokenUser):
+    """Token-only user: id, username, is_staff, is_superuser and role names from the claims"""
+
+    @property
+    def role_names(self):
+        return self.token.get("roles", [])
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    For views that need only the identity, staff flags and role names: builds
+    a ClaimsUser from a token issued with JWT_USER_CLAIMS on, without the cache
+    or the database. The claims are as fresh as the access token (at most
+    ACCESS_TOKEN_LIFETIME old); tokens without them fall back to the cached user.
+    """
+
+    def get_user(self, validated_token):
+        if "roles" in validated_token and api_settings.USER_ID_CLAIM in validated_token:
+            return ClaimsUser(validated_token)
+        return super().get_user(validated_token)
@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Role
+
+User = get_user_model()
+
+
+def permission_cache_key(user_id):
+    return f"auth:perms:{user_id}"
+
+
+class RolePermissionBackend(ModelBackend):
+    """
+    ModelBackend that also grants the permissions of the user's users.Role.
+
+    A user's active role names and the union of their direct, group and role
+    permissions are computed once, cached for PERMISSION_CACHE_TTL seconds and
+    kept on the user object for the rest of the request; users.signals drops
+    the cache entry when any of those assignments change. has_perm() and
+    role_names() are served from these sets.
+    """
+
+    def _grants(self, user_obj):
+        grants = getattr(user_obj, "_role_grants", None)
+        if grants is None:
+            key = permission_cache_key(user_obj.pk)
+            grants = cache.get(key)
+            if grants is None:
+                roles = Role.objects.filter(users=user_obj, is_active=True)
+                role_perms = (
+                    Permission.objects.filter(roles__in=roles)
+                    .values_list("content_type__app_label", "codename")
+                    .distinct()
+                )
+                grants = {
+                    "roles": frozenset(roles.values_list("name", flat=True)),
+                    "perms": frozenset(super().get_all_permissions(user_obj))
+                    | {f"{app_label}.{codename}" for app_label, codename in role_perms},
+                }
+                cache.set(key, grants, settings.PERMISSION_CACHE_TTL)
+            user_obj._role_grants = grants
+        return grants
+
+    def _inactive(self, user_obj, obj):
+        return not user_obj.is_active or user_obj.is_anonymous or obj is not None
+
+    def get_role_permissions(self, user_obj, obj=None):
+        if self._inactive(user_obj, obj):
+            return set()
+        return set(self._grants(user_obj)["perms"]) - super().get_all_permissions(user_obj)
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if self._inactive(user_obj, obj):
+            return set()
+        return set(self._grants(user_obj)["perms"])
+
+    def has_perm(self, user_obj, perm, obj=None):
+        return not self._inactive(user_obj, obj) and perm in self._grants(user_obj)["perms"]
+
+    def role_names(self, user_obj):
+        if self._inactive(user_obj, None):
+            return frozenset()
+        return self._grants(user_obj)["roles"]
+
+
+def role_names(user):
+    """Active role names of a user; token-only users (ClaimsUser) carry them in their claims"""
+    if hasattr(user, "role_names"):
+        return frozenset(user.role_names)
+    return RolePermissionBackend().role_names(user)
+
+
+class UsernameOrEmailBackend(RolePermissionBackend):
+    """
+    Authenticate with either the username or the email address.
+
+    The identifier is resolved with a single case-insensitive query (backed by
+    the UPPER() indexes on users_user) and the password is hashed exactly once,
+    also when no user matches, so response time does not reveal which
+    identifiers exist.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        identifier = username if username is not None else kwargs.get(User.USERNAME_FIELD)
+        if not identifier or password is None:
+            return None
+        identifier = identifier.strip()
+
+        candidates = list(
+            User._default_manager.filter(Q(username__iexact=identifier) | Q(email__iexact=identifier))[:3]
+        )
+        if not candidates:
+            User().set_password(password)  # same hashing cost as a real check
+            return None
+
+        # an exact username wins over an email match, which wins over a case-insensitive username
+        def rank(user):
+            if user.username == identifier:
+                return 0
+            if user.email.lower() == identifier.lower():
+                return 1
+            return 2
+
+        user = min(candidates, key=rank)
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,48 @@
+"""
+Password hashers whose cost comes from settings.
+
+They keep Django's algorithm names, so existing hashes keep verifying; when a
+stored hash was made with different parameters ``must_update`` is true and
+User.check_password re-hashes the password with the current ones on the next
+successful login. Use `manage.py benchmark_password_hashers` to pick values.
+"""
+import base64
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    iterations = settings.PASSWORD_PBKDF2_ITERATIONS or hashers.PBKDF2PasswordHasher.iterations
+
+
+def scrypt_maxmem(work_factor, block_size, parallelism):
+    """Memory bound for hashlib.scrypt: OpenSSL needs 128 * r * (N + p + 2) bytes; allow twice that"""
+    return 2 * 128 * block_size * (work_factor + parallelism + 2)
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """
+    Django's hasher passes maxmem=0, which leaves OpenSSL's 32 MiB default cap,
+    so work factors from 2^15 (at block size 8) raise ValueError. This one
+    sizes maxmem from the parameters of each hash, stored ones included.
+    """
+    work_factor = settings.PASSWORD_SCRYPT_WORK_FACTOR or hashers.ScryptPasswordHasher.work_factor
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        self._check_encode_args(password, salt)
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash_ = hashlib.scrypt(
+            password.encode(), salt=salt.encode(), n=n, r=r, p=p, maxmem=scrypt_maxmem(n, r, p), dklen=64,
+        )
+        hash_ = base64.b64encode(hash_).decode("ascii").strip()
+        return "%s$%d$%s$%d$%d$%s" % (self.algorithm, n, salt, r, p, hash_)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Needs the optional argon2-cffi package"""
+    time_cost = settings.PASSWORD_ARGON2_TIME_COST or hashers.Argon2PasswordHasher.time_cost
+    memory_cost = settings.PASSWORD_ARGON2_MEMORY_COST or hashers.Argon2PasswordHasher.memory_cost
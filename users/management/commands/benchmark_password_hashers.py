@@ -0,0 +1,111 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+
+from users import hashers as project_hashers
+
+PASSWORD = "benchmark-Password-123"
+
+
+def _time_ms(hasher, samples):
+    salt = hasher.salt()
+    runs = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.encode(PASSWORD, salt)
+        runs.append((time.perf_counter() - started) * 1000)
+    return statistics.median(runs)
+
+
+def _hasher(base, **params):
+    return type(f"Benchmark{base.__name__}", (base,), params)()
+
+
+class Command(BaseCommand):
+    help = "Measure password hashing cost on this host and recommend parameters for a target latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target-ms", type=float, default=250.0,
+                            help="Desired time for one hash on one core (default 250 ms)")
+        parser.add_argument("--samples", type=int, default=3, help="Hashes timed per candidate")
+        parser.add_argument("--algorithms", nargs="*", default=["pbkdf2", "scrypt", "argon2"],
+                            choices=["pbkdf2", "scrypt", "argon2"])
+
+    def handle(self, *args, **opts):
+        target, samples = opts["target_ms"], opts["samples"]
+
+        current = get_hasher()
+        current_ms = _time_ms(current, samples)
+        self.stdout.write(
+            f"Current hasher {current.algorithm} ({settings.PASSWORD_HASHER}): {current_ms:.1f} ms/hash, "
+            f"~{1000 / current_ms:.1f} logins/s per core"
+        )
+        self.stdout.write(f"Target {target:.0f} ms/hash, ~{1000 / target:.1f} logins/s per core\n")
+
+        recommendations = []
+        for algorithm in opts["algorithms"]:
+            result = getattr(self, f"_tune_{algorithm}")(target, samples)
+            if result:
+                recommendations.append(result)
+
+        if recommendations:
+            self.stdout.write("\nRecommended settings (environment):")
+            for algorithm, env, ms in recommendations:
+                self.stdout.write(f"  # {algorithm}: {ms:.1f} ms/hash, ~{1000 / ms:.1f} logins/s per core")
+                self.stdout.write(f"  PASSWORD_HASHER={algorithm} " + " ".join(f"{k}={v}" for k, v in env.items()))
+
+    def _tune_pbkdf2(self, target, samples):
+        # cost is linear in iterations: measure once, scale, then verify
+        probe = 100_000
+        ms = _time_ms(_hasher(hashers.PBKDF2PasswordHasher, iterations=probe), samples)
+        iterations = max(10_000, int(probe * target / ms) // 10_000 * 10_000)
+        ms = _time_ms(_hasher(hashers.PBKDF2PasswordHasher, iterations=iterations), samples)
+        self.stdout.write(f"pbkdf2_sha256 iterations={iterations}: {ms:.1f} ms")
+        return "pbkdf2", {"PASSWORD_PBKDF2_ITERATIONS": iterations}, ms
+
+    def _tune_scrypt(self, target, samples):
+        # time the project hasher, so every recommended work factor is one it can compute
+        best = None
+        for exponent in range(12, 21):
+            work_factor = 2 ** exponent
+            memory_mb = 128 * work_factor * project_hashers.ScryptPasswordHasher.block_size / 2 ** 20
+            try:
+                ms = _time_ms(_hasher(project_hashers.ScryptPasswordHasher, work_factor=work_factor), samples)
+            except (ValueError, MemoryError) as e:
+                self.stdout.write(self.style.WARNING(
+                    f"scrypt work_factor=2^{exponent} ({memory_mb:.0f} MiB): failed ({e}); stopping"
+                ))
+                break
+            self.stdout.write(f"scrypt work_factor=2^{exponent} ({memory_mb:.0f} MiB): {ms:.1f} ms")
+            if ms > target and best is not None:
+                break
+            best = (work_factor, ms)
+            if ms > target:
+                break
+        if best is None:
+            self.stdout.write(self.style.WARNING("scrypt: no work factor could be computed on this host"))
+            return None
+        return "scrypt", {"PASSWORD_SCRYPT_WORK_FACTOR": best[0]}, best[1]
+
+    def _tune_argon2(self, target, samples):
+        try:
+            import argon2  # noqa: F401
+        except ImportError:
+            self.stdout.write(self.style.WARNING("argon2: skipped, argon2-cffi is not installed"))
+            return None
+        memory_cost = settings.PASSWORD_ARGON2_MEMORY_COST or hashers.Argon2PasswordHasher.memory_cost
+        best = None
+        for time_cost in range(1, 11):
+            ms = _time_ms(_hasher(hashers.Argon2PasswordHasher, time_cost=time_cost, memory_cost=memory_cost),
+                          samples)
+            self.stdout.write(f"argon2id time_cost={time_cost} memory_cost={memory_cost} KiB: {ms:.1f} ms")
+            if ms > target and best is not None:
+                break
+            best = (time_cost, ms)
+            if ms > target:
+                break
+        return "argon2", {"PASSWORD_ARGON2_TIME_COST": best[0], "PASSWORD_ARGON2_MEMORY_COST": memory_cost}, best[1]
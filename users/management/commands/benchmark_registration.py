@@ -0,0 +1,57 @@
+import statistics
+import time
+import uuid
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from users.services.registration import register_user
+
+FAST_HASHER = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Register throwaway users through users.services.registration and report queries and time per registration"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=50, help="Registrations to run (all rolled back)")
+        parser.add_argument("--with-hashing", action="store_true",
+                            help="Use the configured password hasher instead of MD5 (DB cost only)")
+
+    def handle(self, *args, **opts):
+        hashers = {} if opts["with_hashing"] else {"PASSWORD_HASHERS": FAST_HASHER}
+        run = uuid.uuid4().hex[:8]
+        timings, per_registration, kinds = [], [], Counter()
+
+        with override_settings(**hashers):
+            try:
+                with transaction.atomic():
+                    for i in range(opts["count"]):
+                        with CaptureQueriesContext(connection) as ctx:
+                            started = time.perf_counter()
+                            register_user(
+                                f"bench_{run}_{i}", f"bench_{run}_{i}@example.com", "Bench-Pass-123",
+                                profile={"mobile": "+6500000000"}, send_email=False,
+                            )
+                            timings.append((time.perf_counter() - started) * 1000)
+                        statements = [q["sql"].split(None, 1)[0].upper() for q in ctx.captured_queries]
+                        statements = [s for s in statements if s not in ("SAVEPOINT", "RELEASE")]
+                        per_registration.append(len(statements))
+                        kinds.update(statements)
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+        count = len(timings)
+        breakdown = ", ".join(f"{kind} {n / count:g}" for kind, n in sorted(kinds.items()))
+        self.stdout.write(f"{count} registrations (rolled back), hasher: "
+                          f"{'configured' if opts['with_hashing'] else 'MD5'}")
+        self.stdout.write(f"Queries per registration: {statistics.mean(per_registration):g} ({breakdown})")
+        self.stdout.write(f"Time per registration: median {statistics.median(timings):.2f} ms, "
+                          f"max {max(timings):.2f} ms")
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from users.revocation import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired JWT outstanding/blacklisted token rows in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Tokens deleted per batch")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the expired rows")
+
+    def handle(self, *args, **opts):
+        result = prune_expired_tokens(chunk_size=opts["chunk_size"], dry_run=opts["dry_run"])
+        prefix = "[dry run] " if opts["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{result['outstanding']} expired tokens pruned "
+            f"({result['blacklisted']} blacklisted) in {result['elapsed']}s"
+        ))
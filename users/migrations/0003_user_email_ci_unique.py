@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:43
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Upper
+
+
+def check_email_case_duplicates(apps, schema_editor):
+    """Refuse to add the constraint over emails that differ only in case, listing the accounts to resolve"""
+    User = apps.get_model('users', 'User')
+    duplicated = (
+        User.objects.annotate(email_upper=Upper('email'))
+        .values('email_upper').annotate(n=Count('id')).filter(n__gt=1)
+        .values_list('email_upper', flat=True)
+    )
+    groups = {}
+    for pk, username, email in (
+        User.objects.annotate(email_upper=Upper('email'))
+        .filter(email_upper__in=list(duplicated))
+        .order_by('email_upper', 'id')
+        .values_list('id', 'username', 'email')
+    ):
+        groups.setdefault(email.upper(), []).append(f"#{pk} {username} <{email}>")
+    if groups:
+        lines = "\n".join(f"  {', '.join(accounts)}" for accounts in groups.values())
+        raise RuntimeError(
+            f"Several accounts share an email address that differs only in case ({len(groups)} addresses). "
+            f"Merge or change them, then migrate again:\n{lines}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0002_user_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_email_case_duplicates, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='users_user_email_upper_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Upper('email'), name='users_user_email_upper_uniq'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractUser, Permission
 from django.conf import settings
 from core.models import AuditModel
@@ -14,6 +15,17 @@ class User(AbstractUser, AuditModel):
 
     REQUIRED_FIELDS = ["email"]
 
+    class Meta(AbstractUser.Meta):
+        swappable = "AUTH_USER_MODEL"
+        indexes = [
+            # case-insensitive username/email lookups at login (users.backends)
+            models.Index(Upper("username"), name="users_user_username_upper_idx"),
+        ]
+        constraints = [
+            # one account per address regardless of case; also serves the email lookups
+            models.UniqueConstraint(Upper("email"), name="users_user_email_upper_uniq"),
+        ]
+
     def __str__(self):
         return self.username or self.email
 
@@ -1,9 +1,12 @@
 from rest_framework.permissions import BasePermission
 
+from .backends import role_names
+
 class HasRoleOrPerm(BasePermission):
     """
     Allow if user has ANY of required roles (view.required_roles)
     or ANY of required Django permissions codenames (view.required_perms).
+    Both are answered from the cached sets of users.backends.RolePermissionBackend.
     """
     def has_permission(self, request, view):
         user = request.user
@@ -12,7 +15,7 @@ class HasRoleOrPerm(BasePermission):
         roles_req = getattr(view, "required_roles", [])
         perms_req = getattr(view, "required_perms", [])
         if roles_req:
-            if user.roles.filter(name__in=roles_req, is_active=True).exists():
+            if not role_names(user).isdisjoint(roles_req):
                 return True
         if perms_req:
             if user.has_perms(perms_req):
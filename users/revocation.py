@@ -0,0 +1,159 @@
+"""
+Revoked refresh-token checks that usually answer without a query, and pruning
+of the simplejwt blacklist tables.
+
+Each process keeps a Bloom filter of the blacklisted JTIs. A JTI the filter
+has never seen is not revoked, so checking a valid refresh token costs one
+cache read; a hit (revoked, or one of the filter's rare false positives) is
+confirmed against BlacklistedToken.
+
+Blacklisting a token adds its JTI to the local filter and, on commit, writes a
+new random marker to the cache (users.signals). A process that sees the
+marker change loads the rows above the highest id it has seen, plus the lower
+ids it skipped: those may belong to transactions still in flight, whose commit
+changes the marker again. The filter is rebuilt from scratch every
+TOKEN_REVOCATION_FILTER_REBUILD seconds so expired JTIs drop out.
+"""
+import hashlib
+import math
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from core.utils.batching import chunked_values
+
+MARKER_KEY = "auth:revoked:marker"
+RELOAD_OVERLAP = 300  # seconds a skipped id is looked for again
+GAP_WINDOW = 1000  # ids below the high-water mark checked for gaps
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevokedTokens:
+    """The process-wide filter, kept in step with the blacklist through the cache marker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._marker = None
+        self._built_at = 0.0
+        self._last_id = 0
+        self._gaps = {}  # ids below _last_id not seen yet -> when first missed
+
+    def _load(self, bloom, incremental):
+        queryset = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        if incremental:
+            queryset = queryset.filter(Q(pk__gt=self._last_id) | Q(pk__in=list(self._gaps)))
+        seen = set()
+        for rows in chunked_values(queryset, "token__jti", chunk_size=5000):
+            for pk, jti in rows:
+                bloom.add(jti)
+                seen.add(pk)
+
+        # ids skipped below the new high-water mark may belong to transactions
+        # that commit later; look for them again until RELOAD_OVERLAP passes
+        now = time.monotonic()
+        top = max(seen, default=self._last_id)
+        floor = self._last_id if incremental else top - GAP_WINDOW
+        gaps = self._gaps if incremental else {}
+        for pk in range(max(floor, top - GAP_WINDOW, 0) + 1, top):
+            if pk not in seen:
+                gaps.setdefault(pk, now)
+        self._gaps = {pk: t for pk, t in gaps.items() if pk not in seen and now - t < RELOAD_OVERLAP}
+        self._last_id = max(self._last_id, top) if incremental else top
+
+    def _stale(self):
+        return (
+            self._filter is None
+            or time.monotonic() - self._built_at > settings.TOKEN_REVOCATION_FILTER_REBUILD
+            or self._filter.count > settings.TOKEN_REVOCATION_FILTER_CAPACITY
+        )
+
+    def current(self):
+        marker = cache.get(MARKER_KEY)
+        if marker is None:
+            cache.add(MARKER_KEY, uuid.uuid4().hex, None)
+            marker = cache.get(MARKER_KEY)
+        if marker != self._marker or self._stale():
+            with self._lock:
+                if self._stale():
+                    bloom = BloomFilter(settings.TOKEN_REVOCATION_FILTER_CAPACITY,
+                                        settings.TOKEN_REVOCATION_FILTER_ERROR_RATE)
+                    self._load(bloom, incremental=False)
+                    self._filter, self._built_at = bloom, time.monotonic()
+                elif marker != self._marker:
+                    self._load(self._filter, incremental=True)
+                self._marker = marker
+        return self._filter
+
+    def add(self, jti):
+        if self._filter is not None:
+            self._filter.add(jti)
+
+
+_revoked = RevokedTokens()
+
+
+def _blacklisted(jti):
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+def is_revoked(jti):
+    if settings.TOKEN_REVOCATION_FILTER and jti not in _revoked.current():
+        return False
+    return _blacklisted(jti)
+
+
+def token_revoked(jti):
+    """Record a newly blacklisted JTI: locally now, for other processes on commit"""
+    _revoked.add(jti)
+    transaction.on_commit(lambda: cache.set(MARKER_KEY, uuid.uuid4().hex, None))
+
+
+def prune_expired_tokens(chunk_size=5000, dry_run=False):
+    """Delete expired outstanding tokens and their blacklist entries in batches"""
+    started = time.monotonic()
+    expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+    if dry_run:
+        counts = {
+            "outstanding": expired.count(),
+            "blacklisted": BlacklistedToken.objects.filter(token__in=expired).count(),
+        }
+    else:
+        counts = {"outstanding": 0, "blacklisted": 0}
+        # expired tokens cluster at the low ids, so each keyset chunk is cheap
+        for rows in chunked_values(expired, chunk_size=chunk_size):
+            ids = [pk for pk, in rows]
+            with transaction.atomic():
+                counts["blacklisted"] += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                counts["outstanding"] += OutstandingToken.objects.filter(pk__in=ids).delete()[0]
+    counts["elapsed"] = round(time.monotonic() - started, 2)
+    return counts
@@ -0,0 +1,71 @@
+"""
+Account registration shared by the API (RegisterSerializer) and the template
+and JSON views in authentication.views.
+
+A registration costs two INSERTs in one transaction: the user (created
+unverified and locked) and its profile. The profile is attached to the user
+before it is saved so users.signals.ensure_profile has nothing to do, and the
+one-time code goes to the cache (core.utils.otp). Uniqueness of username and
+email (case-insensitive, users_user_email_upper_uniq) is left to the database;
+the IntegrityError is mapped back to the offending field.
+"""
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+
+from core.utils.emailer import send_otp_email
+from core.utils.otp import issue_otp
+from users.models import Profile
+
+User = get_user_model()
+
+PROFILE_FIELDS = ("full_name", "mobile", "secondary_mobile", "avatar")
+
+
+class RegistrationError(Exception):
+    """``errors`` maps field names to lists of messages"""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def _conflict(exc):
+    # first line only: PostgreSQL appends the duplicate key values on the next
+    message = str(exc).splitlines()[0].lower() if str(exc) else ""
+    if "users_user_username" in message or "users_user.username" in message:
+        return {"username": ["Username already exists."]}
+    if "users_user_email" in message or "users_user.email" in message:
+        return {"email": ["Email already exists."]}
+    return {"non_field_errors": ["Account already exists."]}
+
+
+def register_user(username, email, password, profile=None, send_email=True):
+    """
+    Create an unverified, locked user with its profile and email the OTP.
+    Returns (user, otp_code); raises RegistrationError on a duplicate username
+    or email. The email is sent inside the transaction so a failed send leaves
+    no half-registered account behind.
+    """
+    profile = profile or {}
+    user = User(
+        username=User.normalize_username(username),
+        email=User.objects.normalize_email(email),
+        is_verified=False,
+        is_locked=True,
+    )
+    user.set_password(password)
+    user.profile = Profile(
+        full_name=profile.get("full_name") or user.username,
+        **{field: profile[field] for field in PROFILE_FIELDS[1:] if profile.get(field) is not None},
+    )
+
+    try:
+        with transaction.atomic():
+            user.save()
+            user.profile.save()
+            code = issue_otp(user)
+            if send_email:
+                send_otp_email(user.email, code)
+    except IntegrityError as exc:
+        raise RegistrationError(_conflict(exc)) from exc
+    return user, code
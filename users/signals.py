@@ -1,7 +1,13 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import Profile
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from .models import Profile, Role
+from .backends import permission_cache_key
+from .revocation import token_revoked
+from .tokens import invalidate_user, user_cache_key
 
 User = get_user_model()
 
@@ -12,3 +18,81 @@ def ensure_profile(sender, instance: User, created: bool, **kwargs):
             user=instance,
             defaults={"full_name": instance.get_full_name() or instance.username, "mobile": ""},
         )
+
+
+# --- cache invalidation: users.tokens.cached_user and users.backends permission sets
+# (saving the user covers lock, password, is_staff and is_superuser changes)
+
+def _uncache(user_ids):
+    cache.delete_many([key for pk in user_ids for key in (user_cache_key(pk), permission_cache_key(pk))])
+
+
+def _uncache_users(**lookup):
+    _uncache(User.objects.filter(**lookup).values_list("pk", flat=True).distinct())
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def uncache_user(sender, instance, **kwargs):
+    _uncache([instance.pk])
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def uncache_profile_user(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+ASSIGNMENTS = {
+    User.roles.through: "roles",
+    User.groups.through: "groups",
+    User.user_permissions.through: "user_permissions",
+}
+
+
+@receiver(m2m_changed, sender=User.roles.through)
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def uncache_assignment(sender, instance, action, reverse, pk_set, **kwargs):
+    """user.roles/groups/user_permissions, or the reverse side (role.users, ...)"""
+    if not reverse:
+        if action.startswith("post_"):
+            _uncache([instance.pk])
+    elif action == "pre_clear":
+        # role.users.clear() sends no pk_set; collect the members before they go
+        _uncache_users(**{ASSIGNMENTS[sender]: instance})
+    elif action in ("post_add", "post_remove"):
+        _uncache(pk_set)
+
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def uncache_grant(sender, instance, action, reverse, pk_set, **kwargs):
+    """role/group.permissions, or the reverse side (permission.roles, permission.group_set)"""
+    field = "roles" if sender is Role.permissions.through else "groups"
+    if not reverse:
+        if action.startswith("post_"):
+            _uncache_users(**{field: instance})
+    elif action == "pre_clear":
+        _uncache_users(**{f"{field}__permissions": instance})
+    elif action in ("post_add", "post_remove"):
+        _uncache_users(**{f"{field}__in": pk_set})
+
+
+@receiver(post_save, sender=Role)
+def uncache_role_users(sender, instance, created, **kwargs):
+    if not created:
+        _uncache_users(roles=instance)
+
+
+@receiver(pre_delete, sender=Role)
+@receiver(pre_delete, sender=Group)
+def uncache_deleted_grant_users(sender, instance, **kwargs):
+    # the m2m rows are deleted without m2m_changed
+    _uncache_users(**{"roles" if sender is Role else "groups": instance})
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def blacklisted(sender, instance, created, **kwargs):
+    if created:
+        token_revoked(instance.token.jti)
@@ -0,0 +1,150 @@
+"""
+JWT helpers shared by the auth endpoints and users.authentication.
+
+issue_tokens() creates a token pair carrying a ``ver`` claim (a keyed digest
+of the password hash, so a password change revokes outstanding tokens) and,
+with JWT_USER_CLAIMS on, the staff flags and role names used by
+ClaimsJWTAuthentication.
+
+RefreshToken checks revocation through users.revocation, which answers most
+checks without a query.
+
+cached_user() resolves a user, with profile and roles attached, through the
+cache for JWT_USER_CACHE_TTL seconds, leaving the password hash out of the
+cached copy; users.signals calls invalidate_user()
+whenever the user, their profile or their roles change.
+
+rotate_refresh() is the refresh-token rotation of simplejwt's
+TokenRefreshSerializer without its redundant writes: the user is loaded once
+(not once per blacklist/outstand call) and the blacklist entry of the old
+token plus the outstanding row of the new one are written in one transaction.
+The unique BlacklistedToken row doubles as the guard against a refresh token
+being rotated twice by concurrent requests.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.crypto import salted_hmac
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .backends import role_names
+from .revocation import is_revoked
+
+User = get_user_model()
+
+VERSION_CLAIM = "ver"
+
+
+class RefreshToken(BaseRefreshToken):
+    """Checks the blacklist through users.revocation's filter before the database"""
+
+    def check_blacklist(self):
+        if is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError("Token is blacklisted")
+
+
+def token_version(user):
+    """Changes whenever the password (hash) does"""
+    if "password" in user.get_deferred_fields() and getattr(user, "_token_version", None):
+        # a cached_user() instance: the hash itself was left out of the cache
+        return user._token_version
+    return salted_hmac("users.tokens.token_version", user.password or "").hexdigest()[:16]
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def cached_user(user_id):
+    """
+    The user with ``profile`` and ``roles`` loaded, or None; cached briefly.
+    The password hash is not cached: the instance carries its token_version()
+    instead and loads the hash from the database only if something reads it.
+    """
+    key = user_cache_key(user_id)
+    ttl = settings.JWT_USER_CACHE_TTL
+    user = cache.get(key) if ttl > 0 else None
+    if user is None:
+        user = (
+            User.objects.select_related("profile").prefetch_related("roles")
+            .filter(**{api_settings.USER_ID_FIELD: user_id})
+            .first()
+        )
+        if user is not None and ttl > 0:
+            user._token_version = token_version(user)
+            del user.password  # deferred from here on, so it is not pickled
+            cache.set(key, user, ttl)
+    return user
+
+
+def invalidate_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+def _set_claims(token, user):
+    token[VERSION_CLAIM] = token_version(user)
+    if settings.JWT_USER_CLAIMS:
+        token["username"] = user.get_username()
+        token["is_staff"] = user.is_staff
+        token["is_superuser"] = user.is_superuser
+        token["roles"] = sorted(role_names(user))
+
+
+def issue_tokens(user):
+    """{"access": ..., "refresh": ...} for a user who has just authenticated"""
+    refresh = RefreshToken.for_user(user)
+    _set_claims(refresh, user)
+    return {"access": str(refresh.access_token), "refresh": str(refresh)}
+
+
+def _outstanding_defaults(token, user):
+    return {
+        "user": user,
+        "token": str(token),
+        "created_at": token.current_time,
+        "expires_at": datetime_from_epoch(token["exp"]),
+    }
+
+
+def rotate_refresh(raw_token):
+    """
+    {"access": ..., "refresh": ...} for a valid refresh token ("refresh" only
+    when ROTATE_REFRESH_TOKENS is on). Raises TokenError when the token is
+    invalid, expired, already rotated or belongs to an inactive user.
+    """
+    refresh = RefreshToken(raw_token)  # signature, expiry, type and blacklist
+    user = cached_user(refresh.get(api_settings.USER_ID_CLAIM))
+    if user is None:
+        raise TokenError("Token contained no recognizable user identification")
+    if not api_settings.USER_AUTHENTICATION_RULE(user):
+        raise TokenError("No active account found for the given token.")
+    if refresh.get(VERSION_CLAIM, token_version(user)) != token_version(user):
+        raise TokenError("The user's password has been changed.")
+
+    if not api_settings.ROTATE_REFRESH_TOKENS:
+        _set_claims(refresh, user)
+        return {"access": str(refresh.access_token)}
+
+    with transaction.atomic():
+        if api_settings.BLACKLIST_AFTER_ROTATION:
+            outstanding, _ = OutstandingToken.objects.get_or_create(
+                jti=refresh[api_settings.JTI_CLAIM], defaults=_outstanding_defaults(refresh, user)
+            )
+            _, created = BlacklistedToken.objects.get_or_create(token=outstanding)
+            if not created:
+                # rotated by a concurrent request since RefreshToken() checked
+                raise TokenError("Token is blacklisted")
+
+        # the new pair reflects the current staff flags and roles
+        _set_claims(refresh, user)
+        refresh.set_jti()
+        refresh.set_exp()
+        refresh.set_iat()
+        OutstandingToken.objects.create(jti=refresh[api_settings.JTI_CLAIM], **_outstanding_defaults(refresh, user))
+
+    return {"access": str(refresh.access_token), "refresh": str(refresh)}